@@ -0,0 +1,33 @@
+"""add recommendation table
+
+Revision ID: 3b9e51c2a7d4
+Revises: 7f1514246ab0, d64d9101ed53
+Create Date: 2025-08-04 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3b9e51c2a7d4'
+down_revision = ('7f1514246ab0', 'd64d9101ed53')
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('recommendation',
+    sa.Column('volunteer_id', sa.Uuid(), nullable=False),
+    sa.Column('opportunity_id', sa.Uuid(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['opportunity_id'], ['opportunity.id'], ),
+    sa.ForeignKeyConstraint(['volunteer_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('volunteer_id', 'opportunity_id')
+    )
+    op.create_index('ix_recommendation_volunteer_rank', 'recommendation', ['volunteer_id', 'rank'], unique=False)
+    op.create_index(op.f('ix_recommendation_opportunity_id'), 'recommendation', ['opportunity_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recommendation_opportunity_id'), table_name='recommendation')
+    op.drop_index('ix_recommendation_volunteer_rank', table_name='recommendation')
+    op.drop_table('recommendation')
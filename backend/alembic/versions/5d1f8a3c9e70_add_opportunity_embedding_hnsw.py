@@ -0,0 +1,33 @@
+"""add hnsw index on opportunity embedding
+
+Revision ID: 5d1f8a3c9e70
+Revises: c4a7e09b52f1
+Create Date: 2025-08-11 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5d1f8a3c9e70'
+down_revision = 'c4a7e09b52f1'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.create_index(
+        'ix_opportunity_embedding_hnsw',
+        'opportunity',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+        postgresql_where=sa.text("status = 'OPEN'"),
+    )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_opportunity_embedding_hnsw', table_name='opportunity')
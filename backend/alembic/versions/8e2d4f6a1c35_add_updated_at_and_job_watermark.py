@@ -0,0 +1,35 @@
+"""add updated_at columns and job watermark
+
+Revision ID: 8e2d4f6a1c35
+Revises: 3b9e51c2a7d4
+Create Date: 2025-08-06 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision = '8e2d4f6a1c35'
+down_revision = '3b9e51c2a7d4'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('jobwatermark',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('value', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.add_column('volunteerprofile', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.create_index(op.f('ix_volunteerprofile_updated_at'), 'volunteerprofile', ['updated_at'], unique=False)
+    op.add_column('opportunity', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.create_index(op.f('ix_opportunity_updated_at'), 'opportunity', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_application_applied_at'), 'application', ['applied_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_application_applied_at'), table_name='application')
+    op.drop_index(op.f('ix_opportunity_updated_at'), table_name='opportunity')
+    op.drop_column('opportunity', 'updated_at')
+    op.drop_index(op.f('ix_volunteerprofile_updated_at'), table_name='volunteerprofile')
+    op.drop_column('volunteerprofile', 'updated_at')
+    op.drop_table('jobwatermark')
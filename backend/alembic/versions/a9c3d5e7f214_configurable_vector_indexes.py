@@ -0,0 +1,63 @@
+"""replace embedding b-tree indexes with configurable ANN indexes
+
+Revision ID: a9c3d5e7f214
+Revises: 5d1f8a3c9e70
+Create Date: 2025-08-13 00:00:00.000000
+
+The index parameters are the VECTOR_* defaults, fixed here so the revision
+emits the same DDL everywhere; retune the build in a later revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a9c3d5e7f214'
+down_revision = '5d1f8a3c9e70'
+branch_labels = None
+depends_on = None
+
+ANN_INDEX = {
+    'postgresql_using': 'hnsw',
+    'postgresql_with': {'m': 16, 'ef_construction': 64},
+    'postgresql_ops': {'embedding': 'vector_cosine_ops'},
+}
+
+def upgrade() -> None:
+    # b-tree indexes on vectors cannot serve similarity search
+    op.drop_index('ix_opportunity_embedding', table_name='opportunity')
+    op.drop_index('ix_volunteerprofile_embedding', table_name='volunteerprofile')
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_opportunity_embedding_hnsw', table_name='opportunity')
+    op.create_index(
+        'ix_opportunity_embedding_ann',
+        'opportunity',
+        ['embedding'],
+        unique=False,
+        postgresql_where=sa.text("status = 'OPEN'"),
+        **ANN_INDEX,
+    )
+    op.create_index(
+        'ix_volunteerprofile_embedding_ann',
+        'volunteerprofile',
+        ['embedding'],
+        unique=False,
+        **ANN_INDEX,
+    )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_volunteerprofile_embedding_ann', table_name='volunteerprofile')
+        op.drop_index('ix_opportunity_embedding_ann', table_name='opportunity')
+        op.create_index(
+            'ix_opportunity_embedding_hnsw',
+            'opportunity',
+            ['embedding'],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_where=sa.text("status = 'OPEN'"),
+        )
+    op.create_index(op.f('ix_volunteerprofile_embedding'), 'volunteerprofile', ['embedding'], unique=False)
+    op.create_index(op.f('ix_opportunity_embedding'), 'opportunity', ['embedding'], unique=False)
@@ -0,0 +1,28 @@
+"""add pending embedding queue
+
+Revision ID: b7e1f3a9d062
+Revises: a9c3d5e7f214
+Create Date: 2025-08-20 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1f3a9d062'
+down_revision = 'a9c3d5e7f214'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('pendingembedding',
+    sa.Column('kind', sa.Enum('VOLUNTEER', 'OPPORTUNITY', name='embeddingtarget'), nullable=False),
+    sa.Column('entity_id', sa.Uuid(), nullable=False),
+    sa.Column('queued_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'entity_id')
+    )
+    op.create_index(op.f('ix_pendingembedding_queued_at'), 'pendingembedding', ['queued_at'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pendingembedding_queued_at'), table_name='pendingembedding')
+    op.drop_table('pendingembedding')
+    sa.Enum(name='embeddingtarget').drop(op.get_bind(), checkfirst=True)
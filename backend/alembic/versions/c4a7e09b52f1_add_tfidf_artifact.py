@@ -0,0 +1,26 @@
+"""add tfidf artifact table
+
+Revision ID: c4a7e09b52f1
+Revises: 8e2d4f6a1c35
+Create Date: 2025-08-08 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e09b52f1'
+down_revision = '8e2d4f6a1c35'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table('tfidfartifact',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('vocabulary', sa.JSON(), nullable=True),
+    sa.Column('idf', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('tfidfartifact')
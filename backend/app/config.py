@@ -4,10 +4,48 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     SECRET_KEY: str = "dev-secret"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # take the user id and role from the signed token instead of loading the
+    # user; revoke_user() forces a database check for a user's older tokens
+    AUTH_TRUST_CLAIMS: bool = False
+    # otherwise loaded users are cached per process; a TTL of 0 disables it
+    AUTH_USER_CACHE_TTL: float = 60.0
+    AUTH_USER_CACHE_SIZE: int = 10_000
+    # bcrypt runs on this many processes (0: the default thread executor);
+    # requests beyond PASSWORD_HASH_MAX_PENDING queued hashes get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # login attempts per client address and email; a rate of 0 disables the limit
+    LOGIN_RATE_PER_MINUTE: float = 10.0
+    LOGIN_RATE_BURST: int = 5
+    # logins and registrations per client address, whatever the email
+    AUTH_ADDRESS_RATE_PER_MINUTE: float = 30.0
+    AUTH_ADDRESS_RATE_BURST: int = 10
 
     # database
     DATABASE_URL: str = "sqlite:///./seraaj.db"
 
+    # replica that read-only endpoints query; defaults to DATABASE_URL
+    DATABASE_READ_URL: str | None = None
+
+    # connection pool of each engine, per process: with N uvicorn workers the
+    # database sees up to N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    # from each of the sync and async engines
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 to never recycle
+    # "always" pings on every checkout, "idle" only connections unused for
+    # DB_PRE_PING_IDLE seconds, "never" relies on DB_POOL_RECYCLE
+    DB_PRE_PING: str = Field("idle", pattern="^(always|idle|never)$")
+    DB_PRE_PING_IDLE: float = 30.0
+    # PgBouncer in transaction mode: no prepared statements reused across
+    # transactions
+    DB_PGBOUNCER: bool = False
+    # pool connections of the async engines; turn off when requests may run
+    # on different event loops (e.g. tests), as pooled connections are bound
+    # to the loop that opened them
+    DATABASE_ASYNC_POOL: bool = True
+
     # dev flags
     RESET_ON_START: bool = False        # if True & APP_ENV==local → drop & seed
     SEED_DEMO_DATA: bool = False
@@ -16,6 +54,41 @@ class Settings(BaseSettings):
 
     FRONTEND_URL: str | None = None
 
+    # pgvector ANN indexes on embedding columns created by create_all;
+    # migrations use the defaults, and changing the build options requires
+    # recreating the indexes in a new revision
+    VECTOR_INDEX_TYPE: str = Field("hnsw", pattern="^(hnsw|ivfflat)$")
+    VECTOR_INDEX_OPS: str = Field(
+        "vector_cosine_ops", pattern="^vector_(cosine|l2|ip)_ops$"
+    )
+    VECTOR_HNSW_M: int = 16
+    VECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    VECTOR_IVFFLAT_LISTS: int = 100
+    # query-time recall/latency trade-off, applied per transaction
+    VECTOR_HNSW_EF_SEARCH: int = 40
+    VECTOR_IVFFLAT_PROBES: int = 10
+    # without pgvector: directory for the in-process opportunity index, so
+    # processes memory-map it instead of rebuilding it from the table
+    VECTOR_INDEX_PATH: str | None = None
+
+    # embedding model: "torch" runs it as shipped, "int8" dynamically
+    # quantizes its linear layers for faster CPU inference; threads default
+    # to torch's choice
+    EMBEDDING_BACKEND: str = Field("torch", pattern="^(torch|int8)$")
+    EMBEDDING_THREADS: int | None = None
+    # load the model when a Celery worker process starts
+    EMBEDDING_WARMUP: bool = True
+
+    # embeddings are cached by model and text, in memory and, when a path is
+    # set, in a SQLite file that survives restarts
+    EMBEDDING_CACHE_PATH: str | None = None
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 10_000
+    EMBEDDING_CACHE_DISK_ITEMS: int = 500_000
+
+    # matching: share of unknown tokens in newly scored texts that triggers a
+    # TF-IDF refit and full rescore
+    TFIDF_DRIFT_THRESHOLD: float = 0.05
+
     class Config:
         env_file = ".env"
 
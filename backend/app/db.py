@@ -1,16 +1,187 @@
+import threading
+import time
+from collections import deque
+from uuid import uuid4
+
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, exc, make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from pgvector.sqlalchemy import Vector
 
 from .config import get_settings
 
 settings = get_settings()
-connect_args = {
-    "check_same_thread": False
-} if settings.DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(
-    settings.DATABASE_URL, echo=False, pool_pre_ping=True, connect_args=connect_args
-)
+
+# async drivers for the same database, used by async route handlers
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+# checkout waits kept for the percentiles in PoolMetrics.snapshot
+WAIT_SAMPLES = 1000
+
+
+def async_database_url(url: str) -> str:
+    """Return ``url`` with its driver swapped for the asyncio equivalent."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(
+            f"no async driver for {backend!r} databases; supported: {', '.join(ASYNC_DRIVERS)}"
+        )
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+class PoolMetrics:
+    """Checkout counts and wait times of one connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._waits.append(waited)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_total": self.wait_total * 1000,
+                "wait_ms_max": self.wait_max * 1000,
+            }
+        for name, q in (("wait_ms_p50", 0.5), ("wait_ms_p95", 0.95)):
+            stats[name] = waits[min(len(waits) - 1, int(len(waits) * q))] * 1000 if waits else 0.0
+        capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            saturation=pool.checkedout() / capacity if capacity else 0.0,
+        )
+        return stats
+
+
+class _InstrumentedPool:
+    """Mixin timing how long each checkout waits for a free connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def _ping_idle_connections(engine) -> None:
+    """Ping connections on checkout only when they sat idle long enough to
+    have been dropped, instead of on every checkout."""
+    target = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(target, "checkin")
+    def _checked_in(dbapi_connection, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(target, "checkout")
+    def _checked_out(dbapi_connection, record, proxy):
+        idle = time.monotonic() - record.info.get("checked_in_at", time.monotonic())
+        if idle < settings.DB_PRE_PING_IDLE:
+            return
+        try:
+            alive = target.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            # the pool discards the connection and retries with a new one
+            raise exc.DisconnectionError()
+
+
+def _create_engine(url: str, is_async: bool = False):
+    if is_async:
+        url = async_database_url(url)
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    options: dict = {"echo": False, "pool_pre_ping": settings.DB_PRE_PING == "always"}
+    connect_args: dict = {}
+    if backend == "sqlite" and not is_async:
+        connect_args["check_same_thread"] = False
+    if backend == "postgresql" and is_async and settings.DB_PGBOUNCER:
+        # PgBouncer may hand each transaction a different server connection
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    if is_async and not settings.DATABASE_ASYNC_POOL:
+        options["poolclass"] = NullPool
+    elif issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+        # otherwise SQLite in memory, whose default pool shares one connection:
+        # each connection of a queue pool would open its own empty database
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if is_async:
+        created = create_async_engine(url, connect_args=connect_args, **options)
+    else:
+        created = create_engine(url, connect_args=connect_args, **options)
+    if settings.DB_PRE_PING == "idle":
+        _ping_idle_connections(created)
+    return created
+
+
+engine = _create_engine(settings.DATABASE_URL)
+async_engine = _create_engine(settings.DATABASE_URL, is_async=True)
+if settings.DATABASE_READ_URL:
+    read_engine = _create_engine(settings.DATABASE_READ_URL)
+    async_read_engine = _create_engine(settings.DATABASE_READ_URL, is_async=True)
+else:
+    read_engine, async_read_engine = engine, async_engine
+
+
+def pool_metrics() -> dict[str, dict]:
+    """Return checkout and saturation metrics of each pooled engine."""
+    engines = {
+        "primary": engine,
+        "read": read_engine,
+        "async_primary": async_engine.sync_engine,
+        "async_read": async_read_engine.sync_engine,
+    }
+    return {
+        name: e.pool.metrics.snapshot(e.pool)
+        for name, e in engines.items()
+        if isinstance(e.pool, _InstrumentedPool)
+    }
 
 # ensure pgvector extension exists (Postgres only)
 if engine.url.get_backend_name() == "postgresql":
@@ -24,6 +195,31 @@ def init_db() -> None:
     SQLModel.metadata.create_all(engine)
 
 
+def tune_vector_search(session: Session, limit: int) -> None:
+    """Set ANN search parameters for the current transaction (Postgres only)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    if settings.VECTOR_INDEX_TYPE == "hnsw":
+        # HNSW returns at most ef_search rows
+        ef_search = max(settings.VECTOR_HNSW_EF_SEARCH, limit)
+        session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+    else:
+        probes = settings.VECTOR_IVFFLAT_PROBES
+        session.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+
+
 def get_session() -> Session:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncSession:
+    # loaded objects stay readable after commit, as there is no lazy reload
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session() -> AsyncSession:
+    """Session on the read replica, for endpoints that never write."""
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
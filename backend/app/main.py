@@ -18,6 +18,7 @@ from .routers import (
 )
 from .routers import match as match_router
 from .db import engine, SQLModel
+from .security import hasher
 from seed import seed_demo_data
 
 settings = get_settings()
@@ -55,6 +56,11 @@ def on_startup():
         seed_demo_data()
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    hasher.shutdown()
+
+
 @app.get("/")
 def read_root():
     return {"message": "Seraaj API"}
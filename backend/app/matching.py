@@ -1,101 +1,723 @@
 from __future__ import annotations
 
+import logging
 import os
+from collections import Counter
+from datetime import datetime
+from typing import Iterator
+from uuid import UUID
 
 import numpy as np
 from celery import Celery
+from celery.signals import worker_process_init
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+import sqlalchemy
+from sqlalchemy import cast, column, delete, func, or_, true, update, values
 from sqlmodel import Session, select
 
-from .db import engine
-from .models import Application, VolunteerProfile, Opportunity
+from .config import get_settings
+from .db import engine, tune_vector_search
+from .models import (
+    Application,
+    EmbeddingTarget,
+    JobWatermark,
+    PendingEmbedding,
+    VolunteerProfile,
+    Opportunity,
+    OpportunityStatus,
+    Recommendation,
+    TfidfArtifact,
+    VECTOR_DISTANCES,
+)
 from .routers.settings import FLAGS
+from .services.embedding import embed_many, warmup
+from .services.vector_index import SYNC_LOOKBACK, FlatIndex, VectorIndex, opportunity_index
+
+logger = logging.getLogger(__name__)
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 celery_app = Celery("matching", broker=REDIS_URL)
+celery_app.conf.task_always_eager = os.getenv("CELERY_TASK_ALWAYS_EAGER", "").lower() in ("1", "true")
+
+# JobWatermark row recording the last compute_match_scores run
+MATCH_SCORES_JOB = "compute_match_scores"
+# JobWatermark row: opportunity changes up to here are reflected in the
+# stored recommendations
+RECOMMENDATIONS_JOB = "refresh_recommendations"
+
+# applications scored and committed per transaction by compute_match_scores
+MATCH_CHUNK_SIZE = 1000
+
+# (artifact id, created_at) and vectorizer of the last TF-IDF artifact used
+_loaded_tfidf: tuple[tuple[int, datetime], TfidfVectorizer] | None = None
+
+# number of opportunities stored per volunteer in the Recommendation table
+RECOMMENDATION_LIMIT = 20
+# volunteers ranked per matrix multiply when refreshing recommendations
+RECOMMENDATION_BATCH = 256
+# nearest volunteers read from the ANN index per changed opportunity before
+# falling back to an exact range query
+VOLUNTEER_SCAN_LIMIT = 256
+# float32 scores can differ in the last bit between matrix shapes
+SCORE_TOLERANCE = 1e-6
+
+# pending profiles/opportunities embedded and written back per transaction
+EMBED_BATCH_SIZE = 64
+
+
+@worker_process_init.connect
+def _warm_up_worker(**kwargs) -> None:
+    # in each pool process, after the fork, so torch threads aren't shared
+    warmup()
+
+
+def enqueue(task, *args) -> None:
+    """Queue ``task`` without failing the caller when the broker is down."""
+    try:
+        task.apply_async(args, retry=False)
+    except Exception:
+        # the nightly full refresh catches up on anything missed here
+        logger.warning("could not enqueue %s", task.name, exc_info=True)
+
+
+def _applications_to_score(since: datetime | None):
+    """Return the WHERE clause for applications created, or whose inputs were
+    updated, after ``since`` (every application when ``since`` is ``None``)."""
+    if since is None:
+        return true()
+    changed_volunteers = select(VolunteerProfile.user_id).where(
+        VolunteerProfile.updated_at > since
+    )
+    changed_opportunities = select(Opportunity.id).where(Opportunity.updated_at > since)
+    return or_(
+        Application.applied_at > since,
+        Application.volunteer_id.in_(changed_volunteers),
+        Application.opportunity_id.in_(changed_opportunities),
+    )
+
+
+def _application_chunks(
+    session: Session, condition, chunk_size: int
+) -> Iterator[list[tuple[UUID, UUID, UUID]]]:
+    """Yield ``(id, volunteer_id, opportunity_id)`` rows, keyset-paginated by id."""
+    last_id = None
+    while True:
+        query = (
+            select(Application.id, Application.volunteer_id, Application.opportunity_id)
+            .where(condition)
+            .order_by(Application.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            query = query.where(Application.id > last_id)
+        rows = session.exec(query).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _tfidf_corpus(session: Session) -> Iterator[str]:
+    """Stream the texts of every volunteer and opportunity with an application.
+
+    The vectorizer is always fit on this full corpus so an incremental run
+    scores with the same vocabulary and IDF weights as a full rebuild.
+    """
+    volunteers = session.exec(
+        select(VolunteerProfile.skills, VolunteerProfile.interests)
+        .where(VolunteerProfile.user_id.in_(select(Application.volunteer_id)))
+        .execution_options(yield_per=MATCH_CHUNK_SIZE)
+    )
+    for skills, interests in volunteers:
+        yield " ".join((skills or []) + (interests or []))
+    opportunities = session.exec(
+        select(Opportunity.skills_required)
+        .where(Opportunity.id.in_(select(Application.opportunity_id)))
+        .execution_options(yield_per=MATCH_CHUNK_SIZE)
+    )
+    for skills in opportunities:
+        yield " ".join(skills or [])
+
+
+def _unit_rows(vectors: list) -> np.ndarray:
+    """Stack embeddings into a contiguous float32 matrix of unit-length rows.
+
+    Missing (``None``) and all-zero embeddings become zero rows, so any dot
+    product with them is 0.
+    """
+    dim = next((len(v) for v in vectors if v is not None), 0)
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for row, vector in enumerate(vectors):
+        if vector is not None:
+            matrix[row] = vector
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _embedding_scores(
+    session: Session, rows: list[tuple[UUID, UUID, UUID]]
+) -> list[tuple[UUID, float]]:
+    """Return ``(application_id, score)`` from profile/opportunity embeddings.
+
+    Each distinct embedding is loaded and normalized once, then every pair is
+    scored with a single gathered row-wise dot product.
+    """
+    volunteers = session.exec(
+        select(VolunteerProfile.user_id, VolunteerProfile.embedding).where(
+            VolunteerProfile.user_id.in_({vid for _, vid, _ in rows})
+        )
+    ).all()
+    opportunities = session.exec(
+        select(Opportunity.id, Opportunity.embedding).where(
+            Opportunity.id.in_({oid for _, _, oid in rows})
+        )
+    ).all()
+    vol_rows = {vid: i for i, (vid, _) in enumerate(volunteers)}
+    opp_rows = {oid: i for i, (oid, _) in enumerate(opportunities)}
+    pairs = [
+        (app_id, vol_rows[vid], opp_rows[oid])
+        for app_id, vid, oid in rows
+        if vid in vol_rows and oid in opp_rows
+    ]
+    if not pairs:
+        return []
+
+    vol_matrix = _unit_rows([emb for _, emb in volunteers])
+    opp_matrix = _unit_rows([emb for _, emb in opportunities])
+    app_ids, vol_idx, opp_idx = zip(*pairs)
+    if vol_matrix.shape[1] == 0 or opp_matrix.shape[1] == 0:
+        # no embeddings on one side at all
+        return [(app_id, 0.0) for app_id in app_ids]
+    dots = np.einsum("ij,ij->i", vol_matrix[list(vol_idx)], opp_matrix[list(opp_idx)])
+    return list(zip(app_ids, dots.astype(float).tolist()))
+
+
+def _count_unknown_terms(
+    vectorizer: TfidfVectorizer, texts: list[str], drift: Counter[str]
+) -> None:
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    for text in texts:
+        terms = analyze(text)
+        drift["tokens"] += len(terms)
+        drift["unknown"] += sum(term not in vocabulary for term in terms)
+
+
+def _tfidf_scores(
+    session: Session,
+    rows: list[tuple[UUID, UUID, UUID]],
+    vectorizer: TfidfVectorizer,
+    drift: Counter[str] | None = None,
+) -> list[tuple[UUID, float]]:
+    """Return ``(application_id, score)`` from TF-IDF vectors of the texts.
+
+    Each side is transformed in one call and L2-normalized, then every pair
+    is scored with a single row-wise sparse dot product. This matches
+    ``cosine_similarity`` on the individual rows bit for bit. Token and
+    unknown-term counts are added to ``drift`` when given.
+    """
+    volunteers = session.exec(
+        select(
+            VolunteerProfile.user_id, VolunteerProfile.skills, VolunteerProfile.interests
+        ).where(VolunteerProfile.user_id.in_({vid for _, vid, _ in rows}))
+    ).all()
+    opportunities = session.exec(
+        select(Opportunity.id, Opportunity.skills_required).where(
+            Opportunity.id.in_({oid for _, _, oid in rows})
+        )
+    ).all()
+    vol_rows = {vid: i for i, (vid, _, _) in enumerate(volunteers)}
+    opp_rows = {oid: i for i, (oid, _) in enumerate(opportunities)}
+    pairs = [
+        (app_id, vol_rows[vid], opp_rows[oid])
+        for app_id, vid, oid in rows
+        if vid in vol_rows and oid in opp_rows
+    ]
+    if not pairs:
+        return []
+
+    vol_texts = [
+        " ".join((skills or []) + (interests or [])) for _, skills, interests in volunteers
+    ]
+    opp_texts = [" ".join(skills or []) for _, skills in opportunities]
+    if drift is not None:
+        _count_unknown_terms(vectorizer, vol_texts + opp_texts, drift)
+    vol_matrix = normalize(vectorizer.transform(vol_texts))
+    opp_matrix = normalize(vectorizer.transform(opp_texts))
+    app_ids, vol_idx, opp_idx = zip(*pairs)
+    products = vol_matrix[list(vol_idx)].multiply(opp_matrix[list(opp_idx)])
+    # a mat-vec sums each row in index order like sparse matmul; .sum() may not
+    dots = products @ np.ones(products.shape[1])
+    return list(zip(app_ids, dots.tolist()))
+
+
+def _write_scores(session: Session, scores: list[tuple[UUID, float]]) -> None:
+    """Persist a chunk of match scores in one statement."""
+    if session.get_bind().dialect.name == "postgresql":
+        # UPDATE application SET match_score = v.score FROM (VALUES ...) AS v
+        batch = values(
+            column("id", sqlalchemy.Uuid), column("score", sqlalchemy.Float), name="v"
+        ).data(scores)
+        session.execute(
+            update(Application)
+            .where(Application.id == cast(batch.c.id, sqlalchemy.Uuid))
+            .values(match_score=batch.c.score)
+        )
+    else:
+        session.execute(
+            update(Application),
+            [{"id": app_id, "match_score": score} for app_id, score in scores],
+        )
+
+
+def _set_watermark(session: Session, name: str, value: datetime) -> None:
+    watermark = session.get(JobWatermark, name)
+    if watermark is None:
+        watermark = JobWatermark(name=name, value=value)
+    else:
+        watermark.value = value
+    session.add(watermark)
+
+
+def _remember_tfidf(artifact: TfidfArtifact, vectorizer: TfidfVectorizer) -> TfidfVectorizer:
+    global _loaded_tfidf
+    _loaded_tfidf = ((artifact.id, artifact.created_at), vectorizer)
+    return vectorizer
+
+
+def _fit_tfidf(session: Session) -> TfidfVectorizer:
+    """Fit a vectorizer on the full corpus and store it as a new artifact."""
+    vectorizer = TfidfVectorizer()
+    vectorizer.fit(_tfidf_corpus(session))
+    artifact = TfidfArtifact(
+        vocabulary={term: int(col) for term, col in vectorizer.vocabulary_.items()},
+        idf=vectorizer.idf_.tolist(),
+    )
+    session.add(artifact)
+    session.commit()
+    session.refresh(artifact)
+    return _remember_tfidf(artifact, vectorizer)
+
+
+def _stored_tfidf(session: Session) -> TfidfVectorizer | None:
+    """Return a vectorizer for the latest artifact, or ``None`` if none exists.
+
+    The vectorizer keeps the artifact's vocabulary fixed, so texts transform
+    exactly as they did when it was fit and unknown terms are ignored.
+    """
+    latest = session.exec(
+        select(TfidfArtifact.id, TfidfArtifact.created_at)
+        .order_by(TfidfArtifact.id.desc())
+        .limit(1)
+    ).first()
+    if latest is None:
+        return None
+    if _loaded_tfidf is not None and _loaded_tfidf[0] == tuple(latest):
+        return _loaded_tfidf[1]
+    artifact = session.get(TfidfArtifact, latest[0])
+    vectorizer = TfidfVectorizer(vocabulary=artifact.vocabulary)
+    vectorizer.idf_ = np.array(artifact.idf)
+    return _remember_tfidf(artifact, vectorizer)
+
+
+def score_application(session: Session, application: Application) -> float | None:
+    """Score a single application now, without waiting for the nightly job.
+
+    Returns ``None`` when it cannot be scored yet, e.g. the volunteer has no
+    profile or no TF-IDF artifact has been fit.
+    """
+    rows = [(application.id, application.volunteer_id, application.opportunity_id)]
+    if FLAGS.get("alg_v2"):
+        scores = _embedding_scores(session, rows)
+    else:
+        vectorizer = _stored_tfidf(session)
+        if vectorizer is None:
+            return None
+        scores = _tfidf_scores(session, rows, vectorizer)
+    return scores[0][1] if scores else None
 
 
 @celery_app.task
-def compute_match_scores() -> int:
-    """Compute and persist match scores for all applications."""
+def compute_match_scores(full: bool = False, chunk_size: int = MATCH_CHUNK_SIZE) -> int:
+    """Compute and persist match scores for applications.
+
+    Only applications created since the last run, or whose volunteer profile
+    or opportunity changed since, are rescored against the stored TF-IDF
+    artifact; the window reaches ``SYNC_LOOKBACK`` further back, as rows are
+    stamped before their transaction commits. The first run, and any run with ``full=True`` (e.g. after a
+    scoring or schema change), refits the artifact and rescores every
+    application. A full run is queued when too many terms in the rescored
+    texts are missing from the vocabulary. Applications are streamed and
+    committed ``chunk_size`` at a time, so memory stays flat and a failed run
+    keeps the chunks already written. Returns the number of applications
+    updated.
+    """
+    # taken before reading so rows changed mid-run are picked up next time
+    started = datetime.utcnow()
     with Session(engine) as session:
-        applications = session.exec(select(Application)).all()
-        if not applications:
-            return 0
+        vectorizer = None
+        if not FLAGS.get("alg_v2"):
+            vectorizer = None if full else _stored_tfidf(session)
+            # a new vocabulary changes every score, not just the changed ones
+            full = vectorizer is None
+        watermark = session.get(JobWatermark, MATCH_SCORES_JOB)
+        since = None if full or watermark is None else watermark.value - SYNC_LOOKBACK
+        condition = _applications_to_score(since)
+        total = session.exec(
+            select(func.count()).select_from(Application).where(condition)
+        ).one()
+        if total and full and not FLAGS.get("alg_v2"):
+            vectorizer = _fit_tfidf(session)
+
+        seen = updated = 0
+        drift: Counter[str] = Counter()
+        for rows in _application_chunks(session, condition, chunk_size):
+            if vectorizer is None:
+                scores = _embedding_scores(session, rows)
+            else:
+                scores = _tfidf_scores(session, rows, vectorizer, drift)
+            if scores:
+                _write_scores(session, scores)
+            session.commit()
+            seen += len(rows)
+            updated += len(scores)
+            logger.info("compute_match_scores: %d/%d applications processed", seen, total)
 
-        vol_ids = {a.volunteer_id for a in applications}
-        opp_ids = {a.opportunity_id for a in applications}
-        volunteers = {
-            v.user_id: v
-            for v in session.exec(
-                select(VolunteerProfile).where(VolunteerProfile.user_id.in_(vol_ids))
+        _set_watermark(session, MATCH_SCORES_JOB, started)
+        session.commit()
+
+    if drift["tokens"]:
+        unknown = drift["unknown"] / drift["tokens"]
+        if unknown > get_settings().TFIDF_DRIFT_THRESHOLD:
+            logger.info("compute_match_scores: %.1f%% unknown terms, refitting", unknown * 100)
+            enqueue(compute_match_scores, True)
+    return updated
+
+
+def _opportunity_index(session: Session) -> VectorIndex:
+    """Return a vector index over every rankable opportunity.
+
+    Without pgvector this is the process-wide index, caught up with the
+    table; on Postgres a flat index is loaded for the caller.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return opportunity_index.sync(session)
+    rows = session.exec(
+        select(Opportunity.id, Opportunity.embedding)
+        .where(
+            Opportunity.status == OpportunityStatus.OPEN,
+            Opportunity.embedding.is_not(None),
+        )
+        .order_by(Opportunity.id)
+    ).all()
+    return FlatIndex.from_vectors([oid for oid, _ in rows], [emb for _, emb in rows])
+
+
+def nearest_opportunities(
+    session: Session, embedding, limit: int = RECOMMENDATION_LIMIT
+) -> list[tuple[UUID, float]]:
+    """Return the ``limit`` open opportunities most similar to ``embedding``.
+
+    Results are ``(opportunity_id, cosine similarity)`` pairs, best first. On
+    Postgres the ranking runs in the database through the HNSW index on
+    ``opportunity.embedding``; other backends search the in-process index.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        tune_vector_search(session, limit)
+        # order by the operator the index was built for so it can be used
+        ops = get_settings().VECTOR_INDEX_OPS
+        order = getattr(Opportunity.embedding, VECTOR_DISTANCES[ops])(embedding)
+        rows = session.exec(
+            select(Opportunity.id, Opportunity.embedding.cosine_distance(embedding))
+            .where(
+                Opportunity.status == OpportunityStatus.OPEN,
+                Opportunity.embedding.is_not(None),
+            )
+            .order_by(order)
+            .limit(limit)
+        ).all()
+        return [(oid, 1.0 - float(dist)) for oid, dist in rows]
+
+    return _opportunity_index(session).search(embedding, limit)
+
+
+def _volunteers_near(
+    session: Session, vector: np.ndarray, min_similarity: float
+) -> Iterator[tuple[UUID, float]]:
+    """Yield ``(volunteer_id, similarity)`` for profiles at least
+    ``min_similarity`` from the unit ``vector``.
+
+    On Postgres the nearest volunteers come from the ANN index on
+    ``volunteerprofile.embedding``; only when more of them clear the bar than
+    one index scan returns does an exact range query read the rest. Other
+    backends stream every embedding in batches.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        embedding = vector.tolist()
+        distance = VolunteerProfile.embedding.cosine_distance(embedding)
+        tune_vector_search(session, VOLUNTEER_SCAN_LIMIT)
+        ops = get_settings().VECTOR_INDEX_OPS
+        order = getattr(VolunteerProfile.embedding, VECTOR_DISTANCES[ops])(embedding)
+        nearest = session.exec(
+            select(VolunteerProfile.user_id, distance)
+            .where(VolunteerProfile.embedding.is_not(None))
+            .order_by(order)
+            .limit(VOLUNTEER_SCAN_LIMIT)
+        ).all()
+        for user_id, dist in nearest:
+            if 1.0 - dist >= min_similarity:
+                yield user_id, 1.0 - float(dist)
+        if len(nearest) < VOLUNTEER_SCAN_LIMIT or 1.0 - nearest[-1][1] < min_similarity:
+            return
+        rows = session.exec(
+            select(VolunteerProfile.user_id, distance).where(
+                VolunteerProfile.embedding.is_not(None), distance <= 1.0 - min_similarity
             )
-        }
-        opportunities = {
-            o.id: o
-            for o in session.exec(
-                select(Opportunity).where(Opportunity.id.in_(opp_ids))
+        )
+        for user_id, dist in rows:
+            yield user_id, 1.0 - float(dist)
+        return
+    rows = session.exec(
+        select(VolunteerProfile.user_id, VolunteerProfile.embedding)
+        .where(VolunteerProfile.embedding.is_not(None))
+        .execution_options(yield_per=RECOMMENDATION_BATCH)
+    )
+    for batch in rows.partitions():
+        scores = _unit_rows([emb for _, emb in batch]) @ vector
+        for (user_id, _), score in zip(batch, scores):
+            if score >= min_similarity:
+                yield user_id, float(score)
+
+
+def _volunteers_affected_by(
+    session: Session, changed: set[UUID], index: VectorIndex
+) -> set[UUID]:
+    """Return volunteers whose stored top-N a change to ``changed`` can alter.
+
+    That is everyone currently listing one of the opportunities (it may have
+    closed or been edited), everyone with fewer than ``RECOMMENDATION_LIMIT``
+    stored, and everyone an open one now scores at least their lowest stored
+    match for. The last are found by a similarity search from each
+    opportunity, cut off at the lowest stored match of any volunteer.
+    """
+    affected = set(
+        session.exec(
+            select(Recommendation.volunteer_id).where(
+                Recommendation.opportunity_id.in_(changed)
             )
-        }
+        ).all()
+    )
+    entering = [oid for oid in changed if oid in index]
+    if not entering:
+        return affected
 
-        updated = 0
+    # the last row of a full list holds its lowest score
+    full = select(Recommendation.volunteer_id).where(
+        Recommendation.rank == RECOMMENDATION_LIMIT
+    )
+    affected.update(
+        session.exec(
+            select(VolunteerProfile.user_id).where(
+                VolunteerProfile.embedding.is_not(None),
+                VolunteerProfile.user_id.not_in(full),
+            )
+        ).all()
+    )
+    cutoff = session.exec(
+        select(func.min(Recommendation.score)).where(
+            Recommendation.rank == RECOMMENDATION_LIMIT
+        )
+    ).one()
+    if cutoff is None:
+        return affected
 
-        if FLAGS.get("alg_v2"):
-            vol_vecs: dict[str, np.ndarray] = {}
-            opp_vecs: dict[str, np.ndarray] = {}
-        else:
-            texts = [
-                " ".join((vol.skills or []) + (vol.interests or []))
-                for vol in volunteers.values()
-            ] + [" ".join(opp.skills_required or []) for opp in opportunities.values()]
-            vectorizer = TfidfVectorizer()
-            vectorizer.fit(texts)
-            vol_vecs = {
-                vid: vectorizer.transform(
-                    [
-                        " ".join(
-                            (volunteers[vid].skills or [])
-                            + (volunteers[vid].interests or [])
-                        )
-                    ]
-                )
-                for vid in volunteers
-            }
-            opp_vecs = {
-                oid: vectorizer.transform(
-                    [" ".join(opportunities[oid].skills_required or [])]
+    best: dict[UUID, float] = {}
+    for vector in index.vectors(entering):
+        for user_id, score in _volunteers_near(session, vector, cutoff - SCORE_TOLERANCE):
+            best[user_id] = max(score, best.get(user_id, score))
+    candidates = [vid for vid in best if vid not in affected]
+    for start in range(0, len(candidates), RECOMMENDATION_BATCH):
+        floors = session.exec(
+            select(Recommendation.volunteer_id, Recommendation.score).where(
+                Recommendation.rank == RECOMMENDATION_LIMIT,
+                Recommendation.volunteer_id.in_(candidates[start : start + RECOMMENDATION_BATCH]),
+            )
+        )
+        for user_id, lowest in floors:
+            if best[user_id] >= lowest - SCORE_TOLERANCE:
+                affected.add(user_id)
+    return affected
+
+
+def _store_recommendations(
+    session: Session, volunteer_ids: set[UUID] | None, index: VectorIndex
+) -> int:
+    """Replace the stored top-N of ``volunteer_ids`` (everyone when ``None``)."""
+    profiles = select(VolunteerProfile.user_id, VolunteerProfile.embedding).where(
+        VolunteerProfile.embedding.is_not(None)
+    )
+    stale = delete(Recommendation)
+    if volunteer_ids is not None:
+        if not volunteer_ids:
+            return 0
+        profiles = profiles.where(VolunteerProfile.user_id.in_(volunteer_ids))
+        stale = stale.where(Recommendation.volunteer_id.in_(volunteer_ids))
+    session.execute(stale)
+
+    now = datetime.utcnow()
+    refreshed = 0
+    rows = session.exec(profiles.execution_options(yield_per=RECOMMENDATION_BATCH))
+    for batch in rows.partitions():
+        ranked = index.search_many([emb for _, emb in batch], RECOMMENDATION_LIMIT)
+        for (user_id, _), matches in zip(batch, ranked):
+            for rank, (opp_id, score) in enumerate(matches, start=1):
+                session.add(
+                    Recommendation(
+                        volunteer_id=user_id,
+                        opportunity_id=opp_id,
+                        score=score,
+                        rank=rank,
+                        computed_at=now,
+                    )
                 )
-                for oid in opportunities
-            }
-
-        for app in applications:
-            vol = volunteers.get(app.volunteer_id)
-            opp = opportunities.get(app.opportunity_id)
-            if not vol or not opp:
-                continue
-            if FLAGS.get("alg_v2"):
-                if vol.embedding is None or opp.embedding is None:
-                    score = 0.0
-                else:
-                    v = np.array(vol.embedding)
-                    o = np.array(opp.embedding)
-                    score = float(v @ o / (np.linalg.norm(v) * np.linalg.norm(o)))
-            else:
-                vol_vec = vol_vecs[app.volunteer_id]
-                opp_vec = opp_vecs[app.opportunity_id]
-                score = cosine_similarity(vol_vec, opp_vec)[0][0]
-            app.match_score = float(score)
-            session.add(app)
-            updated += 1
+        refreshed += len(batch)
+    return refreshed
+
+
+@celery_app.task
+def refresh_recommendations(
+    volunteer_ids: list[str] | None = None,
+    opportunity_ids: list[str] | None = None,
+) -> int:
+    """Recompute stored recommendations for the volunteers affected by a change.
 
+    ``volunteer_ids`` rebuilds those volunteers, e.g. after a profile update.
+    ``opportunity_ids`` rebuilds only the volunteers a created, edited or
+    closed opportunity can affect. Every run also covers opportunities
+    changed since the ``RECOMMENDATIONS_JOB`` watermark and then advances
+    it, so stored lists older than a change are only stale while the
+    watermark is behind it. With neither argument, or no watermark yet,
+    every volunteer is rebuilt. Returns the number of volunteers whose list
+    was rewritten.
+    """
+    with Session(engine) as session:
+        started = datetime.utcnow()
+        index = _opportunity_index(session)
+        watermark = session.get(JobWatermark, RECOMMENDATIONS_JOB)
+        if watermark is None or (volunteer_ids is None and opportunity_ids is None):
+            affected = None
+        else:
+            affected = {UUID(vid) for vid in volunteer_ids or []}
+            # late commits may carry an updated_at just before the watermark
+            changed = set(
+                session.exec(
+                    select(Opportunity.id).where(
+                        Opportunity.updated_at > watermark.value - SYNC_LOOKBACK
+                    )
+                ).all()
+            )
+            changed |= {UUID(oid) for oid in opportunity_ids or []}
+            if changed:
+                affected |= _volunteers_affected_by(session, changed, index)
+        refreshed = _store_recommendations(session, affected, index)
+        _set_watermark(session, RECOMMENDATIONS_JOB, started)
         session.commit()
-        return updated
+        return refreshed
+
+
+def profile_text(profile: VolunteerProfile) -> str:
+    """Text a volunteer profile is embedded from."""
+    return " ".join(profile.skills or [])
+
+
+def opportunity_text(opportunity: Opportunity) -> str:
+    """Text an opportunity is embedded from."""
+    return opportunity.description
+
+
+def queue_embedding(session: Session, kind: EmbeddingTarget, entity_id: UUID) -> None:
+    """Mark an entity for re-embedding in the caller's transaction.
+
+    Repeated updates before the job runs collapse into one pending row.
+    Enqueue :func:`embed_pending` after committing.
+    """
+    session.merge(PendingEmbedding(kind=kind, entity_id=entity_id, queued_at=datetime.utcnow()))
+
+
+_EMBEDDED = {
+    EmbeddingTarget.VOLUNTEER: (VolunteerProfile, VolunteerProfile.user_id, profile_text),
+    EmbeddingTarget.OPPORTUNITY: (Opportunity, Opportunity.id, opportunity_text),
+}
+
+
+@celery_app.task
+def embed_pending(batch_size: int = EMBED_BATCH_SIZE) -> int:
+    """Embed queued profiles and opportunities and refresh their recommendations.
+
+    Pending rows are taken ``batch_size`` at a time, oldest first, encoded
+    in one batch and written back with one bulk update per table. A row
+    queued again while its batch was running stays pending for the next
+    pass. Returns the number of embeddings written.
+    """
+    written = 0
+    volunteers: set[str] = set()
+    opportunities: set[str] = set()
+    with Session(engine) as session:
+        while True:
+            pending = session.exec(
+                select(PendingEmbedding)
+                .order_by(PendingEmbedding.queued_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not pending:
+                break
+            for kind, (model, key, text) in _EMBEDDED.items():
+                ids = [p.entity_id for p in pending if p.kind == kind]
+                if not ids:
+                    continue
+                entities = session.exec(select(model).where(key.in_(ids))).all()
+                vectors = embed_many([text(entity) for entity in entities])
+                rows = [
+                    {key.key: getattr(entity, key.key), "embedding": vector}
+                    for entity, vector in zip(entities, vectors)
+                ]
+                if rows:
+                    session.execute(update(model), rows)
+                written += len(rows)
+                changed = {str(row[key.key]) for row in rows}
+                (volunteers if kind == EmbeddingTarget.VOLUNTEER else opportunities).update(changed)
+            done = PendingEmbedding.__table__
+            session.connection().execute(
+                delete(done).where(
+                    done.c.kind == sqlalchemy.bindparam("k"),
+                    done.c.entity_id == sqlalchemy.bindparam("e"),
+                    done.c.queued_at == sqlalchemy.bindparam("q"),
+                ),
+                [{"k": p.kind.name, "e": p.entity_id, "q": p.queued_at} for p in pending],
+            )
+            session.commit()
+            logger.info("embed_pending: %d embeddings written", written)
+
+    if volunteers or opportunities:
+        enqueue(refresh_recommendations, sorted(volunteers), sorted(opportunities))
+    return written
 
 
 celery_app.conf.beat_schedule = {
     "nightly-match": {
-        "task": "matching.compute_match_scores",
+        "task": compute_match_scores.name,
         "schedule": 24 * 60 * 60,  # once a day
-    }
+    },
+    "nightly-recommendations": {
+        "task": refresh_recommendations.name,
+        "schedule": 24 * 60 * 60,
+    },
+    # picks up rows queued while the broker was unreachable
+    "pending-embeddings": {
+        "task": embed_pending.name,
+        "schedule": 5 * 60,
+    },
 }
@@ -6,9 +6,43 @@ from uuid import UUID, uuid4
 import enum
 import sqlalchemy
 from pgvector.sqlalchemy import Vector
-from pydantic import EmailStr, ConfigDict
+from pydantic import EmailStr, ConfigDict, field_serializer
 from sqlmodel import Field, SQLModel
 
+from .config import get_settings
+
+
+# pgvector comparator used to order by each index operator class
+VECTOR_DISTANCES = {
+    "vector_cosine_ops": "cosine_distance",
+    "vector_l2_ops": "l2_distance",
+    "vector_ip_ops": "max_inner_product",
+}
+
+
+def vector_index_options(column: str) -> dict:
+    """Return the ``postgresql_*`` index options configured in settings."""
+    settings = get_settings()
+    if settings.VECTOR_INDEX_TYPE == "hnsw":
+        params = {
+            "m": settings.VECTOR_HNSW_M,
+            "ef_construction": settings.VECTOR_HNSW_EF_CONSTRUCTION,
+        }
+    else:
+        params = {"lists": settings.VECTOR_IVFFLAT_LISTS}
+    return {
+        "postgresql_using": settings.VECTOR_INDEX_TYPE,
+        "postgresql_with": params,
+        "postgresql_ops": {column: settings.VECTOR_INDEX_OPS},
+    }
+
+
+def vector_index(name: str, column: str, **kwargs) -> sqlalchemy.Index:
+    """ANN index on a pgvector column; skipped on other databases."""
+    return sqlalchemy.Index(
+        name, column, **vector_index_options(column), **kwargs
+    ).ddl_if(dialect="postgresql")
+
 
 class UserRole(str, enum.Enum):
     VOLUNTEER = "VOLUNTEER"
@@ -27,6 +61,11 @@ class ApplicationStatus(str, enum.Enum):
     REJECTED = "REJECTED"
 
 
+class EmbeddingTarget(str, enum.Enum):
+    VOLUNTEER = "VOLUNTEER"
+    OPPORTUNITY = "OPPORTUNITY"
+
+
 class User(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     email: EmailStr = Field(index=True, unique=True)
@@ -37,6 +76,8 @@ class User(SQLModel, table=True):
 
 
 class VolunteerProfile(SQLModel, table=True):
+    __table_args__ = (vector_index("ix_volunteerprofile_embedding_ann", "embedding"),)
+
     user_id: UUID = Field(foreign_key="user.id", primary_key=True)
     full_name: str
     skills: List[str] = Field(sa_column=sqlalchemy.Column(sqlalchemy.JSON))
@@ -54,9 +95,14 @@ class VolunteerProfile(SQLModel, table=True):
     location_lng: float | None = None
     availability_hours: int
     embedding: list[float] | None = Field(
-        sa_column=sqlalchemy.Column(Vector(768), index=True, nullable=True),
+        sa_column=sqlalchemy.Column(Vector(768), nullable=True),
         default=None,
     )
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -72,12 +118,21 @@ class Organization(SQLModel, table=True):
 
 
 class Opportunity(SQLModel, table=True):
+    __table_args__ = (
+        # only rows that can be recommended are searched
+        vector_index(
+            "ix_opportunity_embedding_ann",
+            "embedding",
+            postgresql_where=sqlalchemy.text("status = 'OPEN'"),
+        ),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     org_id: UUID = Field(foreign_key="organization.id")
     title: str
     description: str
     embedding: list[float] | None = Field(
-        sa_column=sqlalchemy.Column(Vector(768), index=True, nullable=True),
+        sa_column=sqlalchemy.Column(Vector(768), nullable=True),
         default=None,
     )
     skills_weighted: Dict[str, int] = Field(
@@ -95,9 +150,19 @@ class Opportunity(SQLModel, table=True):
     end_date: date
     is_remote: bool = True
     status: OpportunityStatus
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_serializer("embedding")
+    def _embedding_as_list(self, embedding):
+        # pgvector loads the column as a numpy array
+        return None if embedding is None else [float(x) for x in embedding]
+
 
 class Application(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
@@ -105,7 +170,53 @@ class Application(SQLModel, table=True):
     opportunity_id: UUID = Field(foreign_key="opportunity.id")
     status: ApplicationStatus
     match_score: float | None = None
-    applied_at: datetime = Field(default_factory=datetime.utcnow)
+    applied_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobWatermark(SQLModel, table=True):
+    """Point up to which a background job has processed its inputs."""
+
+    name: str = Field(primary_key=True)
+    value: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TfidfArtifact(SQLModel, table=True):
+    """Fitted TF-IDF vocabulary and IDF weights, one row per version."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    vocabulary: Dict[str, int] = Field(sa_column=sqlalchemy.Column(sqlalchemy.JSON))
+    idf: List[float] = Field(sa_column=sqlalchemy.Column(sqlalchemy.JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PendingEmbedding(SQLModel, table=True):
+    """Profile or opportunity whose embedding the background job must recompute."""
+
+    kind: EmbeddingTarget = Field(primary_key=True)
+    entity_id: UUID = Field(primary_key=True)
+    queued_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Recommendation(SQLModel, table=True):
+    """Precomputed top-N opportunity for a volunteer, filled by a background job."""
+
+    __table_args__ = (
+        sqlalchemy.Index("ix_recommendation_volunteer_rank", "volunteer_id", "rank"),
+    )
+
+    volunteer_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    opportunity_id: UUID = Field(foreign_key="opportunity.id", primary_key=True, index=True)
+    score: float
+    rank: int
+    computed_at: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -3,11 +3,12 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends
-from sqlmodel import Session, select, SQLModel
+from sqlmodel import select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db import get_session
+from ..db import get_async_read_session, get_async_session
 from ..models import AnalyticsRecord
-from .dependencies import get_current_user
+from .dependencies import get_current_user_async
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -21,33 +22,35 @@ class RecordCreate(SQLModel):
 
 
 @router.post("/record", response_model=AnalyticsRecord)
-def create_record(
+async def create_record(
     rec_in: RecordCreate,
-    session: Session = Depends(get_session),
-    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(get_current_user_async),
 ) -> AnalyticsRecord:
     rec = AnalyticsRecord(**rec_in.model_dump())
     session.add(rec)
-    session.commit()
-    session.refresh(rec)
+    await session.commit()
+    await session.refresh(rec)
     return rec
 
 
 @router.get("/volunteer/{vol_id}", response_model=List[AnalyticsRecord])
-def records_for_volunteer(
+async def records_for_volunteer(
     vol_id: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ) -> List[AnalyticsRecord]:
-    return session.exec(
+    result = await session.exec(
         select(AnalyticsRecord).where(AnalyticsRecord.volunteer_id == UUID(vol_id))
-    ).all()
+    )
+    return result.all()
 
 
 @router.get("/organization/{org_id}", response_model=List[AnalyticsRecord])
-def records_for_org(
+async def records_for_org(
     org_id: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ) -> List[AnalyticsRecord]:
-    return session.exec(
+    result = await session.exec(
         select(AnalyticsRecord).where(AnalyticsRecord.organization_id == UUID(org_id))
-    ).all()
+    )
+    return result.all()
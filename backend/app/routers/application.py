@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select, SQLModel
 from uuid import UUID
 
+from .. import matching
 from ..db import get_session
 from ..models import (
     Application,
@@ -58,6 +59,7 @@ def apply(
         opportunity_id=UUID(opp_id),
         volunteer_id=user.id,
     )
+    application.match_score = matching.score_application(session, application)
     session.add(application)
     session.commit()
     session.refresh(application)
@@ -1,16 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import math
 import os
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr, ConfigDict
 from uuid import UUID
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db import get_session
+from ..db import get_async_session, get_session
 from ..models import User, UserRole
+from ..security import HasherBusy, RateLimiter, address_limiter, hasher, login_limiter
 from .dependencies import get_current_user
 
 from ..config import get_settings
@@ -21,8 +23,6 @@ SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
@@ -50,14 +50,6 @@ class UserLogin(BaseModel):
     password: str
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
-
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -65,29 +57,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+async def _run_hasher(call):
+    try:
+        return await call
+    except HasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _rate_limit(limiter: RateLimiter, key: str) -> None:
+    retry_after = limiter.hit(key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def _client_address(request: Request) -> str:
+    return request.client.host if request.client else ""
+
+
 @router.post("/register", response_model=Token)
-def register(user: UserCreate, session: Session = Depends(get_session)):
-    existing = session.exec(select(User).where(User.email == user.email)).first()
+async def register(
+    user: UserCreate,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    # every registration costs a bcrypt hash
+    _rate_limit(address_limiter, _client_address(request))
+    existing = (await session.exec(select(User).where(User.email == user.email))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    db_user = User(email=user.email, hashed_password=get_password_hash(user.password), role=user.role)
+    hashed_password = await _run_hasher(hasher.hash(user.password))
+    db_user = User(email=user.email, hashed_password=hashed_password, role=user.role)
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
     access_token = create_access_token({"sub": str(db_user.id), "role": db_user.role})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login", response_model=Token)
-def login(credentials: UserLogin, session: Session = Depends(get_session)):
-    db_user = session.exec(select(User).where(User.email == credentials.email)).first()
-    if not db_user or not verify_password(credentials.password, db_user.hashed_password):
+async def login(
+    credentials: UserLogin,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    # the address bucket bounds the hashing one client can cause across
+    # emails; the per-account one is tighter, so clients sharing an address
+    # (or an untrusted proxy) do not lock each other out of their accounts
+    host = _client_address(request)
+    _rate_limit(address_limiter, host)
+    _rate_limit(login_limiter, f"{host}|{credentials.email.strip().lower()}")
+    db_user = (await session.exec(select(User).where(User.email == credentials.email))).first()
+    if not db_user or not await _run_hasher(
+        hasher.verify(credentials.password, db_user.hashed_password)
+    ):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     access_token = create_access_token({"sub": str(db_user.id), "role": db_user.role})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserRead)
-def read_me(current=Depends(get_current_user)):
+def read_me(current=Depends(get_current_user), session: Session = Depends(get_session)):
     """Return the currently authenticated user."""
-    return current
+    user = session.get(User, current.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
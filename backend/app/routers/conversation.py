@@ -3,11 +3,13 @@ from typing import List
 from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, SQLModel
+from sqlmodel import select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db import get_session
-from ..models import Conversation, Message, User
-from .dependencies import get_current_user
+from ..db import get_async_read_session, get_async_session
+from ..models import Conversation, Message
+from ..services.auth_cache import CurrentUser
+from .dependencies import get_current_user_async
 
 router = APIRouter(prefix="/conversation", tags=["conversation"])
 
@@ -17,39 +19,40 @@ class ConversationCreate(SQLModel):
 
 
 @router.post("", response_model=Conversation)
-def create_conversation(
+async def create_conversation(
     conv_in: ConversationCreate,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    user: CurrentUser = Depends(get_current_user_async),
 ) -> Conversation:
     if user.id not in conv_in.participant_ids:
         conv_in.participant_ids.append(user.id)
     conv = Conversation(participant_ids=conv_in.participant_ids)
     session.add(conv)
-    session.commit()
-    session.refresh(conv)
+    await session.commit()
+    await session.refresh(conv)
     return conv
 
 
 @router.get("", response_model=List[Conversation])
-def list_conversations(
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+async def list_conversations(
+    session: AsyncSession = Depends(get_async_read_session),
+    user: CurrentUser = Depends(get_current_user_async),
 ) -> List[Conversation]:
-    return session.exec(
+    result = await session.exec(
         select(Conversation).where(
             Conversation.participant_ids.contains([str(user.id)])
         )
-    ).all()
+    )
+    return result.all()
 
 
 @router.get("/{conv_id}", response_model=Conversation)
-def get_conversation(
+async def get_conversation(
     conv_id: str,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_read_session),
+    user: CurrentUser = Depends(get_current_user_async),
 ) -> Conversation:
-    conv = session.get(Conversation, UUID(conv_id))
+    conv = await session.get(Conversation, UUID(conv_id))
     if not conv or str(user.id) not in [str(pid) for pid in conv.participant_ids]:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conv
@@ -60,13 +63,13 @@ class MessageCreate(SQLModel):
 
 
 @router.post("/{conv_id}/message", response_model=Message)
-def send_message(
+async def send_message(
     conv_id: str,
     msg_in: MessageCreate,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    user: CurrentUser = Depends(get_current_user_async),
 ) -> Message:
-    conv = session.get(Conversation, UUID(conv_id))
+    conv = await session.get(Conversation, UUID(conv_id))
     if not conv or str(user.id) not in [str(pid) for pid in conv.participant_ids]:
         raise HTTPException(status_code=404, detail="Conversation not found")
     msg = Message(
@@ -75,20 +78,21 @@ def send_message(
         content=msg_in.content,
     )
     session.add(msg)
-    session.commit()
-    session.refresh(msg)
+    await session.commit()
+    await session.refresh(msg)
     return msg
 
 
 @router.get("/{conv_id}/messages", response_model=List[Message])
-def list_messages(
+async def list_messages(
     conv_id: str,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_read_session),
+    user: CurrentUser = Depends(get_current_user_async),
 ) -> List[Message]:
-    conv = session.get(Conversation, UUID(conv_id))
+    conv = await session.get(Conversation, UUID(conv_id))
     if not conv or str(user.id) not in [str(pid) for pid in conv.participant_ids]:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    return session.exec(
+    result = await session.exec(
         select(Message).where(Message.conversation_id == conv.id)
-    ).all()
+    )
+    return result.all()
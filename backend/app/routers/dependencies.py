@@ -3,11 +3,15 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..config import get_settings
-from ..db import get_session
+from ..db import get_async_session, get_session
 from ..models import User, UserRole
+from ..services.auth_cache import CurrentUser, RevocationList, TTLCache
 from uuid import UUID
 
 settings = get_settings()
@@ -16,13 +20,30 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+user_cache: TTLCache[CurrentUser] = TTLCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+)
+revoked = RevocationList(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# User columns whose change invalidates token claims and cached users
+_AUTH_COLUMNS = ("role", "hashed_password")
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
-    credentials_exception = HTTPException(
+
+@event.listens_for(User.__table__, "after_drop")
+def _forget_users(target, connection, **kw) -> None:
+    user_cache.clear()
+    revoked.clear()
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _claims_from_token(token: str | None) -> dict:
+    credentials_exception = _credentials_error()
     if token is None:
         raise credentials_exception
     try:
@@ -30,16 +51,91 @@ def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Dep
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        payload["sub"] = UUID(user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
-    user = session.get(User, UUID(user_id))
+    return payload
+
+
+def revoke_user(user_id: UUID) -> None:
+    """Check the user's tokens against the database until they have expired.
+
+    Called when a user's role or password change, or the user is deleted,
+    so that neither the claims in their tokens nor a cached copy are trusted
+    any more.
+    """
+    revoked.add(user_id)
+    user_cache.discard(user_id)
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _revoke_changed_users(session, flush_context) -> None:
+    """Revoke users whose role or password is flushed, or who are deleted.
+
+    Bulk ``update()``/``delete()`` statements bypass this; call
+    :func:`revoke_user` after those.
+    """
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in _AUTH_COLUMNS):
+                revoke_user(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            revoke_user(obj.id)
+
+
+def _cached_user(claims: dict) -> Optional[CurrentUser]:
+    """Resolve the user without the database, or return None if it's needed."""
+    user_id = claims["sub"]
+    if user_id in revoked:
+        return None
+    if settings.AUTH_TRUST_CLAIMS and claims.get("role") in UserRole.__members__:
+        return CurrentUser(user_id, UserRole(claims["role"]))
+    return user_cache.get(user_id)
+
+
+def _remember(user: Optional[User]) -> CurrentUser:
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_error()
+    current = CurrentUser(user.id, user.role)
+    if user.id not in revoked:
+        user_cache.put(user.id, current)
+    return current
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)
+) -> CurrentUser:
+    claims = _claims_from_token(token)
+    current = _cached_user(claims)
+    if current is None:
+        current = _remember(session.get(User, claims["sub"]))
+    return current
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)
+) -> CurrentUser:
+    """Async counterpart of :func:`get_current_user` for async handlers."""
+    claims = _claims_from_token(token)
+    current = _cached_user(claims)
+    if current is None:
+        current = _remember(await session.get(User, claims["sub"]))
+    return current
 
 
 def require_role(role: str):
-    def wrapper(user: User = Depends(get_current_user)):
+    def wrapper(user: CurrentUser = Depends(get_current_user)):
+        if user.role != UserRole(role):
+            raise HTTPException(status_code=403, detail="Insufficient privileges")
+        return user
+
+    return wrapper
+
+
+def require_role_async(role: str):
+    async def wrapper(user: CurrentUser = Depends(get_current_user_async)):
         if user.role != UserRole(role):
             raise HTTPException(status_code=403, detail="Insufficient privileges")
         return user
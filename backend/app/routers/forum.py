@@ -3,11 +3,12 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, SQLModel
+from sqlmodel import select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db import get_session
+from ..db import get_async_read_session, get_async_session
 from ..models import ForumPost, ForumReply
-from .dependencies import get_current_user
+from .dependencies import get_current_user_async
 
 router = APIRouter(prefix="/forum", tags=["forum"])
 
@@ -18,10 +19,10 @@ class PostCreate(SQLModel):
 
 
 @router.post("/post", response_model=ForumPost)
-def create_post(
+async def create_post(
     post_in: PostCreate,
-    session: Session = Depends(get_session),
-    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(get_current_user_async),
 ) -> ForumPost:
     post = ForumPost(
         author_id=user.id,
@@ -29,19 +30,20 @@ def create_post(
         content=post_in.content,
     )
     session.add(post)
-    session.commit()
-    session.refresh(post)
+    await session.commit()
+    await session.refresh(post)
     return post
 
 
 @router.get("/post", response_model=List[ForumPost])
-def list_posts(session: Session = Depends(get_session)) -> List[ForumPost]:
-    return session.exec(select(ForumPost)).all()
+async def list_posts(session: AsyncSession = Depends(get_async_read_session)) -> List[ForumPost]:
+    result = await session.exec(select(ForumPost))
+    return result.all()
 
 
 @router.get("/post/{post_id}", response_model=ForumPost)
-def get_post(post_id: str, session: Session = Depends(get_session)) -> ForumPost:
-    post = session.get(ForumPost, UUID(post_id))
+async def get_post(post_id: str, session: AsyncSession = Depends(get_async_read_session)) -> ForumPost:
+    post = await session.get(ForumPost, UUID(post_id))
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     return post
@@ -52,13 +54,13 @@ class ReplyCreate(SQLModel):
 
 
 @router.post("/post/{post_id}/reply", response_model=ForumReply)
-def add_reply(
+async def add_reply(
     post_id: str,
     rep_in: ReplyCreate,
-    session: Session = Depends(get_session),
-    user=Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(get_current_user_async),
 ) -> ForumReply:
-    post = session.get(ForumPost, UUID(post_id))
+    post = await session.get(ForumPost, UUID(post_id))
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     reply = ForumReply(
@@ -67,13 +69,14 @@ def add_reply(
         content=rep_in.content,
     )
     session.add(reply)
-    session.commit()
-    session.refresh(reply)
+    await session.commit()
+    await session.refresh(reply)
     return reply
 
 
 @router.get("/post/{post_id}/replies", response_model=List[ForumReply])
-def list_replies(post_id: str, session: Session = Depends(get_session)) -> List[ForumReply]:
-    return session.exec(
+async def list_replies(post_id: str, session: AsyncSession = Depends(get_async_read_session)) -> List[ForumReply]:
+    result = await session.exec(
         select(ForumReply).where(ForumReply.post_id == UUID(post_id))
-    ).all()
+    )
+    return result.all()
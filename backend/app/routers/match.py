@@ -1,43 +1,159 @@
-from fastapi import APIRouter, Depends
+import json
+
+from fastapi import APIRouter, Depends, Query, Request
+from starlette.concurrency import run_in_threadpool
 try:
     from sse_starlette.sse import EventSourceResponse  # type: ignore
 except Exception:  # pragma: no cover - fall back for tests
     from fastapi.responses import Response as EventSourceResponse
-from sqlmodel import select
+from sqlalchemy import func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
 
-from ..db import get_session
-from ..models import Opportunity, VolunteerProfile
-from ..services.embedding import embed
-from .dependencies import get_current_user
+from .. import matching
+from ..db import async_read_engine, get_async_read_session, read_engine
+from ..models import JobWatermark, Opportunity, Recommendation, VolunteerProfile
+from .dependencies import get_current_user_async
 
 router = APIRouter(prefix="/match", tags=["match"])
 
+# seconds between keep-alive comments on an idle stream
+PING_SECONDS = 15
+
+
+async def stored_matches(session: AsyncSession, volunteer_id: UUID, limit: int = 20):
+    """Return ``(opportunity, score)`` pairs from the precomputed table."""
+    result = await session.exec(
+        select(Opportunity, Recommendation.score)
+        .join(Recommendation, Recommendation.opportunity_id == Opportunity.id)
+        .where(Recommendation.volunteer_id == volunteer_id)
+        .order_by(Recommendation.rank)
+        .limit(limit)
+    )
+    return result.all()
+
+
+def live_matches(session: Session, embedding, limit: int = 20):
+    """Return ``(opportunity, score)`` pairs ranked on demand."""
+    nearest = matching.nearest_opportunities(session, embedding, limit)
+    opps = {
+        o.id: o
+        for o in session.exec(
+            select(Opportunity).where(Opportunity.id.in_([oid for oid, _ in nearest]))
+        )
+    }
+    return [(opps[oid], score) for oid, score in nearest if oid in opps]
+
+
+def _rows(ranked) -> list[tuple[str, str, float]]:
+    return [(str(o.id), o.title, float(score)) for o, score in ranked]
+
+
+def _live_rows(embedding, limit: int):
+    # ranking is shared with the Celery tasks and stays synchronous, so it
+    # runs on the threadpool
+    with Session(read_engine) as session:
+        return _rows(live_matches(session, embedding, limit))
+
 
-def rank(vol_embedding: list[float], opps: list[Opportunity]):
-    """Cosine-similarity ranking (quick numpy implementation)."""
-    import numpy as np
+async def _first_pass(volunteer: VolunteerProfile, limit: int):
+    """Return the fast ranking and whether it should be refined.
 
-    v = np.array(vol_embedding)
-    for o in opps:
-        if o.embedding:
-            o._score = float(
-                v @ np.array(o.embedding) / (np.linalg.norm(v) * np.linalg.norm(o.embedding))
+    Stored recommendations are used when present; they need refining when
+    the profile changed after they were computed, when an opportunity
+    changed that the recommendation refresh has not covered yet, or when
+    more results are asked for than were stored. Otherwise the live ranking
+    is the first pass and a refresh is queued for next time.
+    """
+    async with AsyncSession(async_read_engine) as session:
+        stored = await stored_matches(session, volunteer.user_id, limit)
+        if not stored:
+            live = await run_in_threadpool(_live_rows, volunteer.embedding, limit)
+            await run_in_threadpool(
+                matching.enqueue, matching.refresh_recommendations, [str(volunteer.user_id)]
             )
-        else:
-            o._score = -1.0
-    return sorted(opps, key=lambda o: o._score, reverse=True)
+            return live, False
+        computed_at = (
+            await session.exec(
+                select(func.min(Recommendation.computed_at)).where(
+                    Recommendation.volunteer_id == volunteer.user_id
+                )
+            )
+        ).one()
+        stale = volunteer.updated_at > computed_at or await _opportunities_pending(session)
+        return _rows(stored), stale or len(stored) < limit
+
+
+async def _opportunities_pending(session: AsyncSession) -> bool:
+    """Whether an opportunity changed after the last recommendation refresh."""
+    watermark = await session.get(JobWatermark, matching.RECOMMENDATIONS_JOB)
+    if watermark is None:
+        return True
+    result = await session.exec(
+        select(Opportunity.id).where(Opportunity.updated_at > watermark.value).limit(1)
+    )
+    return result.first() is not None
+
+
+def _same_ranking(a, b) -> bool:
+    # stored scores are float32 while pgvector computes in float64
+    return [row[0] for row in a] == [row[0] for row in b] and all(
+        abs(x[2] - y[2]) < 1e-6 for x, y in zip(a, b)
+    )
+
+
+def _resume_point(last_event_id: str | None) -> tuple[int, int]:
+    """Parse a ``pass:rank`` event id; events up to it were already received."""
+    try:
+        phase, rank = (last_event_id or "").split(":")
+        return int(phase), int(rank)
+    except ValueError:
+        return -1, 0
+
+
+def _events(name: str, phase: int, rows, resume: tuple[int, int]):
+    for rank, (opp_id, title, score) in enumerate(rows, start=1):
+        if (phase, rank) > resume:
+            yield {
+                "event": name,
+                "id": f"{phase}:{rank}",
+                "data": json.dumps({"rank": rank, "id": opp_id, "title": title, "score": score}),
+            }
 
 
 @router.get("/me")
-def stream_my_matches(current=Depends(get_current_user), session=Depends(get_session)):
-    vp = session.get(VolunteerProfile, current.id)
-    if not vp or not vp.embedding:
+async def stream_my_matches(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=100),
+    current=Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    """Stream the volunteer's best opportunities as server-sent events.
+
+    ``match`` events carry a fast first ranking (stored recommendations, or
+    a live nearest-neighbour search when none are stored). If that ranking
+    may be out of date, ``refined`` events follow with the current ranking,
+    which replaces it. A ``done`` event ends the stream. Event ids are
+    ``pass:rank``, and a reconnect with ``Last-Event-ID`` skips events
+    already received. Comment pings keep idle connections open.
+    """
+    # read here, as app.matching may still be importing this module
+    limit = limit or matching.RECOMMENDATION_LIMIT
+    vp = await session.get(VolunteerProfile, current.id)
+    if not vp or vp.embedding is None:
         return []
-    opps = session.exec(select(Opportunity)).all()
-    ranked = rank(vp.embedding, opps)[:20]
+    resume = _resume_point(request.headers.get("last-event-id"))
 
     async def event_generator():
-        for o in ranked:
-            yield f"data: {o.id}|{o.title}|{o._score}\n\n"
+        first, refine = await _first_pass(vp, limit)
+        for event in _events("match", 0, first, resume):
+            yield event
+        if refine and not await request.is_disconnected():
+            refined = await run_in_threadpool(_live_rows, vp.embedding, limit)
+            if not _same_ranking(first, refined):
+                for event in _events("refined", 1, refined, resume):
+                    yield event
+        yield {"event": "done", "id": "2:0", "data": ""}
 
-    return EventSourceResponse(event_generator())
+    return EventSourceResponse(event_generator(), ping=PING_SECONDS)
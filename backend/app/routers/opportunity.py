@@ -2,25 +2,28 @@ from __future__ import annotations
 from typing import List, Dict
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
-from ..db import get_session
-from ..models import Opportunity, OpportunityStatus, Organization
+from .. import matching
+from ..db import get_async_read_session, get_async_session
+from ..models import EmbeddingTarget, Opportunity, OpportunityStatus, Organization
 from sqlmodel import SQLModel
 from datetime import date
-from .dependencies import require_role
+from .dependencies import require_role_async
 
 router = APIRouter(prefix="/opportunity", tags=["opportunity"])
 
 
 @router.get("/{opp_id}", response_model=Opportunity)
-def get_opportunity(
+async def get_opportunity(
     opp_id: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ) -> Opportunity:
     """Return a single opportunity."""
-    opp = session.get(Opportunity, UUID(opp_id))
+    opp = await session.get(Opportunity, UUID(opp_id))
     if not opp:
         raise HTTPException(status_code=404, detail="Opportunity not found")
     return opp
@@ -41,25 +44,52 @@ class OpportunityCreate(SQLModel):
 
 
 @router.post("/org/{org_id}", response_model=Opportunity)
-def create_opportunity(
+async def create_opportunity(
     org_id: str,
     opp_in: OpportunityCreate,
-    session: Session = Depends(get_session),
-    user=Depends(require_role("ORG_ADMIN")),
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(require_role_async("ORG_ADMIN")),
 ) -> Opportunity:
     """Create an opportunity for the given organization."""
-    org = session.get(Organization, UUID(org_id))
+    org = await session.get(Organization, UUID(org_id))
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
     if org.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     opp = Opportunity(**opp_in.model_dump(exclude_none=True), org_id=org.id)
     session.add(opp)
-    session.commit()
-    session.refresh(opp)
+    await session.run_sync(matching.queue_embedding, EmbeddingTarget.OPPORTUNITY, opp.id)
+    await session.commit()
+    await session.refresh(opp)
+    # recommendations are refreshed once the embedding is written
+    await run_in_threadpool(matching.enqueue, matching.embed_pending)
+    return opp
+
+
+@router.post("/{opp_id}/close", response_model=Opportunity)
+async def close_opportunity(
+    opp_id: str,
+    session: AsyncSession = Depends(get_async_session),
+    user=Depends(require_role_async("ORG_ADMIN")),
+) -> Opportunity:
+    """Close an opportunity so it no longer accepts applications."""
+    opp = await session.get(Opportunity, UUID(opp_id))
+    if not opp:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    org = await session.get(Organization, opp.org_id)
+    if not org or org.owner_id != user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    opp.status = OpportunityStatus.CLOSED
+    session.add(opp)
+    await session.commit()
+    await session.refresh(opp)
+    await run_in_threadpool(
+        matching.enqueue, matching.refresh_recommendations, None, [str(opp.id)]
+    )
     return opp
 
 
 @router.get("/search", response_model=List[Opportunity])
-def search_opportunity(session: Session = Depends(get_session)):
-    return session.exec(select(Opportunity).where(Opportunity.status == OpportunityStatus.OPEN)).all()
+async def search_opportunity(session: AsyncSession = Depends(get_async_read_session)):
+    result = await session.exec(select(Opportunity).where(Opportunity.status == OpportunityStatus.OPEN))
+    return result.all()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
-from ..db import engine
+from ..db import engine, pool_metrics
 from .dependencies import require_role
 import os
 
@@ -38,3 +38,8 @@ def system_health(user=Depends(require_role("SUPERADMIN"))):
         db = False
     # redis/workers would normally be checked via ping; stub True
     return {"db": db, "redis": redis, "worker": worker}
+
+@router.get("/db/pool")
+def db_pool(user=Depends(require_role("SUPERADMIN"))):
+    """Checkout wait times and saturation of each connection pool."""
+    return pool_metrics()
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
 
+from .. import matching
 from ..db import get_session
-from ..models import VolunteerProfile
+from ..models import EmbeddingTarget, VolunteerProfile
 from uuid import UUID
 from .dependencies import get_current_user, require_role
 
@@ -16,15 +17,21 @@ def upsert_profile(
     user=Depends(require_role("VOLUNTEER")),
 ) -> VolunteerProfile:
     profile.user_id = user.id
+    # an embedding sent by the client is kept; otherwise it is recomputed
+    # in the background
+    reembed = "embedding" not in profile.model_fields_set
     existing = session.get(VolunteerProfile, profile.user_id)
     if existing:
         for field, value in profile.dict(exclude_unset=True, exclude={"user_id"}).items():
             setattr(existing, field, value)
-        session.add(existing)
-        session.commit()
-        session.refresh(existing)
-        return existing
+        profile = existing
+    if reembed:
+        matching.queue_embedding(session, EmbeddingTarget.VOLUNTEER, user.id)
     session.add(profile)
     session.commit()
     session.refresh(profile)
+    if reembed:
+        matching.enqueue(matching.embed_pending)
+    else:
+        matching.enqueue(matching.refresh_recommendations, [str(user.id)])
     return profile
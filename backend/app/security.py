@@ -0,0 +1,134 @@
+"""Password hashing off the event loop, and login rate limiting.
+
+bcrypt costs a few hundred milliseconds of CPU per call. Hashes are computed
+in a small process pool so they neither block the event loop nor occupy the
+threadpool that synchronous endpoints run on.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+from .config import get_settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+
+class HasherBusy(RuntimeError):
+    """Raised when too many hashes are already queued."""
+
+
+class PasswordHasher:
+    """Run bcrypt on ``workers`` processes, or the default thread executor if 0.
+
+    At most ``max_pending`` calls are queued or running; beyond that
+    :class:`HasherBusy` is raised instead of letting the backlog grow.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _get_executor(self) -> Executor | None:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn, as forking a process with running threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HasherBusy("password hasher is saturated")
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # a worker died; start a fresh pool on the next call
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RateLimiter:
+    """Token bucket per key: ``per_minute`` requests with bursts of ``burst``.
+
+    Only the ``max_keys`` most recently seen keys are tracked. A rate of 0
+    disables the limit.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_keys: int = 10_000) -> None:
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> float:
+        """Take a token for ``key``; return 0, or the seconds until one is free."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+settings = get_settings()
+hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+login_limiter = RateLimiter(settings.LOGIN_RATE_PER_MINUTE, settings.LOGIN_RATE_BURST)
+address_limiter = RateLimiter(
+    settings.AUTH_ADDRESS_RATE_PER_MINUTE, settings.AUTH_ADDRESS_RATE_BURST
+)
@@ -0,0 +1,97 @@
+"""In-process caches that let authentication skip the ``user`` table."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Generic, Hashable, TypeVar
+from uuid import UUID
+
+from ..models import UserRole
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated user as seen by route handlers.
+
+    A plain snapshot rather than a ``User`` row, so it can be shared between
+    requests and never touches a session.
+    """
+
+    id: UUID
+    role: UserRole
+
+
+class TTLCache(Generic[T]):
+    """Thread-safe LRU of at most ``max_items`` entries, each kept ``ttl`` seconds.
+
+    A ``ttl`` or ``max_items`` of zero disables the cache.
+    """
+
+    def __init__(self, max_items: int, ttl: float) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: OrderedDict[Hashable, tuple[float, T]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: Hashable) -> T | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._items.pop(key, None)
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: T) -> None:
+        if self.ttl <= 0 or self.max_items <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class RevocationList:
+    """Users whose tokens must be checked against the database.
+
+    Entries expire after ``ttl`` seconds; set it to the token lifetime so
+    every token issued before the revocation has expired by then. The list
+    is per process.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._until: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: UUID) -> None:
+        with self._lock:
+            self._until[user_id] = time.monotonic() + self.ttl
+
+    def __contains__(self, user_id: UUID) -> bool:
+        with self._lock:
+            until = self._until.get(user_id)
+            if until is not None and until <= time.monotonic():
+                del self._until[user_id]
+                until = None
+            return until is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
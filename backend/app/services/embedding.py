@@ -1,26 +1,99 @@
-from typing import TYPE_CHECKING
+import logging
+import threading
+from typing import TYPE_CHECKING, Sequence
 
-try:  # runtime optional import
-    from sentence_transformers import SentenceTransformer as _ST
-except Exception:  # pragma: no cover
-    _ST = None
+import numpy as np
+
+from ..config import get_settings
+from .embedding_cache import EmbeddingCache
 
 if TYPE_CHECKING:
     from sentence_transformers import SentenceTransformer
-else:  # pragma: no cover
-    SentenceTransformer = object if _ST is None else _ST  # type: ignore
 
-model: SentenceTransformer | None = None
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "all-mpnet-base-v2"
+
+model: "SentenceTransformer | None" = None
+cache: EmbeddingCache | None = None
+_model_lock = threading.Lock()
+
+
+def load_model(backend: str = "torch", threads: int | None = None) -> "SentenceTransformer":
+    """Load the model for CPU inference; ``backend="int8"`` quantizes its
+    linear layers to int8. torch is imported here rather than at module import.
+    """
+    try:
+        import torch
+        from sentence_transformers import SentenceTransformer
+    except ImportError as exc:
+        raise RuntimeError("sentence-transformers not installed") from exc
+    if threads:
+        torch.set_num_threads(threads)
+    loaded = SentenceTransformer(MODEL_NAME, device="cpu" if backend == "int8" else None)
+    if backend == "int8":
+        loaded = torch.ao.quantization.quantize_dynamic(
+            loaded, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    loaded.eval()
+    return loaded
 
 
-def get_model() -> SentenceTransformer:
+def model_id() -> str:
+    """Identify the model and backend, since int8 vectors differ slightly."""
+    backend = get_settings().EMBEDDING_BACKEND
+    return MODEL_NAME if backend == "torch" else f"{MODEL_NAME}:{backend}"
+
+
+def get_model() -> "SentenceTransformer":
     global model
     if model is None:
-        if _ST is None:
-            raise RuntimeError("sentence-transformers not installed")
-        model = _ST("all-mpnet-base-v2")
+        with _model_lock:
+            if model is None:
+                settings = get_settings()
+                model = load_model(settings.EMBEDDING_BACKEND, settings.EMBEDDING_THREADS)
     return model
 
 
+def warmup() -> None:
+    """Load the model and run one forward pass so the first real call is fast.
+
+    Does nothing when ``EMBEDDING_WARMUP`` is off, and only logs a warning if
+    the model can't be loaded.
+    """
+    if not get_settings().EMBEDDING_WARMUP:
+        return
+    try:
+        get_model().encode(["warmup"], show_progress_bar=False)
+    except Exception:
+        logger.warning("embedding model warmup failed", exc_info=True)
+
+
+def get_cache() -> EmbeddingCache:
+    global cache
+    if cache is None:
+        settings = get_settings()
+        cache = EmbeddingCache(
+            model_id(),
+            settings.EMBEDDING_CACHE_PATH or None,
+            memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+            disk_items=settings.EMBEDDING_CACHE_DISK_ITEMS,
+        )
+    return cache
+
+
+def _encode(texts: list[str], batch_size: int) -> np.ndarray:
+    vectors = get_model().encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def embed_many(texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+    """Return one float32 row per text; only texts not in the cache are encoded."""
+    return get_cache().embed_many(texts, lambda missing: _encode(missing, batch_size))
+
+
 def embed(text: str) -> list[float]:
-    return get_model().encode(text).tolist()
+    return embed_many([text])[0].tolist()
+
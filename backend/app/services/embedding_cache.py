@@ -0,0 +1,163 @@
+"""Content-addressed cache of text embeddings.
+
+Vectors are keyed by a hash of the model name and the normalized text, held
+in an in-memory LRU and, optionally, a SQLite file that survives restarts.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+import numpy as np
+
+# SQLite's default limit on bound parameters is 999
+_SQL_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace; the model sees no difference."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode()).digest()
+
+
+class EmbeddingCache:
+    """Two-tier cache in front of an ``encode(texts) -> float32 matrix`` function.
+
+    ``memory_items`` vectors stay in an LRU. With ``path``, every vector is
+    also written to a SQLite file holding at most ``disk_items`` rows, with
+    the least recently used rows evicted first. Hit, miss and eviction
+    counts are reported by :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        path: str | None = None,
+        memory_items: int = 10_000,
+        disk_items: int = 500_000,
+    ) -> None:
+        self.model_name = model_name
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embedding "
+                "(key BLOB PRIMARY KEY, vector BLOB NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_embedding_used_at ON embedding (used_at)"
+            )
+            self._db.commit()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            disk = self._db.execute("SELECT count(*) FROM embedding").fetchone()[0] if self._db else 0
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_items": len(self._memory),
+                "disk_items": disk,
+            }
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        found: dict[bytes, np.ndarray] = {}
+        if self._db is None or not keys:
+            return found
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start : start + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for key, blob in self._db.execute(
+                f"SELECT key, vector FROM embedding WHERE key IN ({marks})", chunk
+            ):
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            now = time.time()
+            self._db.executemany(
+                "UPDATE embedding SET used_at = ? WHERE key = ?", [(now, k) for k in found]
+            )
+            self._db.commit()
+        return found
+
+    def _store(self, vectors: dict[bytes, np.ndarray]) -> None:
+        if self._db is None or not vectors:
+            return
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embedding (key, vector, used_at) VALUES (?, ?, ?)",
+            [(k, np.ascontiguousarray(v, dtype=np.float32).tobytes(), now) for k, v in vectors.items()],
+        )
+        excess = self._db.execute("SELECT count(*) FROM embedding").fetchone()[0] - self.disk_items
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM embedding WHERE key IN "
+                "(SELECT key FROM embedding ORDER BY used_at LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+        self._db.commit()
+
+    def embed_many(
+        self, texts: Sequence[str], encode: Callable[[list[str]], np.ndarray]
+    ) -> np.ndarray:
+        """Return one float32 row per text, encoding only texts not cached.
+
+        Each distinct uncached text is passed to ``encode`` once.
+        """
+        keys = [cache_key(self.model_name, text) for text in texts]
+        found: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self.memory_hits += sum(key in found for key in keys)
+            missing = list(dict.fromkeys(k for k in keys if k not in found))
+            loaded = self._load(missing)
+            for key, vector in loaded.items():
+                self._remember(key, vector)
+            found.update(loaded)
+            self.disk_hits += sum(key in loaded for key in keys)
+
+        todo = {key: text for key, text in zip(keys, texts) if key not in found}
+        if todo:
+            encoded = np.asarray(encode(list(todo.values())), dtype=np.float32)
+            computed = dict(zip(todo, encoded))
+            with self._lock:
+                self.misses += sum(key in computed for key in keys)
+                for key, vector in computed.items():
+                    self._remember(key, vector)
+                self._store(computed)
+            found.update(computed)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,378 @@
+"""In-process vector search for databases without pgvector."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, Sequence
+from uuid import UUID, uuid4
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from ..config import get_settings
+from ..models import Opportunity, OpportunityStatus
+
+EMBEDDING_DIM = 768
+# rows updated this long before the last sync are re-read, so transactions
+# that committed late with an older updated_at are not missed
+SYNC_LOOKBACK = timedelta(minutes=5)
+# a saved index is refreshed this often, so restarts replay few changes
+SAVE_INTERVAL = timedelta(minutes=10)
+# file in a snapshot directory naming the version subdirectory to load
+CURRENT = "CURRENT"
+
+
+def _unit(vectors, dim: int) -> np.ndarray:
+    matrix = np.array(vectors, dtype=np.float32).reshape(-1, dim)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class VectorIndex(ABC):
+    """Cosine-similarity index from keys to embeddings."""
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def __contains__(self, key: Hashable) -> bool: ...
+
+    @abstractmethod
+    def add(self, key: Hashable, vector: Sequence[float]) -> None:
+        """Insert ``key`` or replace its vector."""
+
+    @abstractmethod
+    def remove(self, key: Hashable) -> None:
+        """Drop ``key`` if present."""
+
+    @abstractmethod
+    def vectors(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """Return the normalized vectors of ``keys`` as rows."""
+
+    @abstractmethod
+    def search_many(
+        self, queries: Sequence[Sequence[float]], k: int
+    ) -> list[list[tuple[Hashable, float]]]:
+        """Return the ``k`` best ``(key, similarity)`` pairs for each query."""
+
+    def search(self, query: Sequence[float], k: int) -> list[tuple[Hashable, float]]:
+        return self.search_many([query], k)[0]
+
+
+class FlatIndex(VectorIndex):
+    """Exact search over a float32 matrix of unit rows.
+
+    Queries are scored with one matrix multiply per batch and the top ``k``
+    picked with ``argpartition``. Ties are returned in insertion order, but
+    removing a key moves the last row into its slot.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, capacity: int = 1024) -> None:
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._keys: list[Hashable] = []
+        self._rows: dict[Hashable, int] = {}
+
+    @classmethod
+    def from_vectors(
+        cls, keys: Sequence[Hashable], vectors, dim: int = EMBEDDING_DIM
+    ) -> "FlatIndex":
+        index = cls(dim, capacity=max(len(keys), 1))
+        if len(keys):
+            index._vectors[: len(keys)] = _unit(vectors, dim)
+        index._keys = list(keys)
+        index._rows = {key: row for row, key in enumerate(index._keys)}
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def add(self, key: Hashable, vector: Sequence[float]) -> None:
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row == len(self._vectors):
+                grown = np.zeros((max(1, 2 * row), self.dim), dtype=np.float32)
+                grown[:row] = self._vectors
+                self._vectors = grown
+            self._keys.append(key)
+            self._rows[key] = row
+        self._vectors[row] = _unit(vector, self.dim)[0]
+
+    def remove(self, key: Hashable) -> None:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._vectors[row] = self._vectors[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+
+    def vectors(self, keys: Sequence[Hashable]) -> np.ndarray:
+        return self._vectors[[self._rows[key] for key in keys]]
+
+    def search_many(
+        self, queries: Sequence[Sequence[float]], k: int
+    ) -> list[list[tuple[Hashable, float]]]:
+        queries = _unit(queries, self.dim)
+        n = len(self._keys)
+        k = min(k, n)
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self._vectors[:n].T
+        if k < n:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n), scores.shape)
+        results = []
+        for row_scores, rows in zip(scores, top):
+            rows = rows[np.lexsort((rows, -row_scores[rows]))]
+            results.append([(self._keys[r], float(row_scores[r])) for r in rows])
+        return results
+
+    def save(self, path: str | Path, **meta) -> None:
+        """Write ``vectors.npy`` and ``keys.json`` (keys as strings) under ``path``.
+
+        Each save writes a new version subdirectory, then atomically replaces
+        the ``CURRENT`` file naming it, so a reader never pairs keys and
+        vectors from different saves and always finds a complete snapshot.
+        When processes save concurrently, the last to switch ``CURRENT``
+        wins. Older versions, except the one just replaced, are removed.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=path))
+        try:
+            np.save(staging / "vectors.npy", self._vectors[: len(self._keys)])
+            with open(staging / "keys.json", "w") as fh:
+                json.dump({"dim": self.dim, "keys": [str(k) for k in self._keys], **meta}, fh)
+            version = path / uuid4().hex
+            os.rename(staging, version)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        previous = _current_version(path)
+        pointer = path / f".{CURRENT}-{uuid4().hex}"
+        pointer.write_text(version.name)
+        os.replace(pointer, path / CURRENT)
+        for entry in path.iterdir():
+            # hidden entries are other processes' saves in progress
+            if entry.is_dir() and not entry.name.startswith(".") and entry.name not in (
+                version.name,
+                previous,
+            ):
+                shutil.rmtree(entry, ignore_errors=True)
+
+    @classmethod
+    def load(
+        cls, path: str | Path, key: Callable[[str], Hashable] = str, mmap: bool = True
+    ) -> tuple["FlatIndex", dict]:
+        """Read an index written by :meth:`save` and return it with its metadata.
+
+        With ``mmap`` the vectors are memory-mapped copy-on-write, so large
+        indexes load instantly and the file on disk is never modified.
+        """
+        path = Path(path)
+        version = _current_version(path)
+        if version is None:
+            raise FileNotFoundError(f"{path}: no saved index")
+        path = path / version
+        with open(path / "keys.json") as fh:
+            meta = json.load(fh)
+        index = cls(meta.pop("dim"), capacity=1)
+        index._vectors = np.load(path / "vectors.npy", mmap_mode="c" if mmap else None)
+        index._keys = [key(k) for k in meta.pop("keys")]
+        if index._vectors.shape != (len(index._keys), index.dim):
+            raise ValueError(
+                f"{path}: {len(index._keys)} keys for vectors of shape {index._vectors.shape}"
+            )
+        index._rows = {k: row for row, k in enumerate(index._keys)}
+        return index, meta
+
+
+def _current_version(path: Path) -> str | None:
+    """Return the version subdirectory ``CURRENT`` names, if any."""
+    try:
+        return (path / CURRENT).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class OpportunityIndex(VectorIndex):
+    """Thread-safe :class:`FlatIndex` of open opportunities with embeddings.
+
+    Writes committed through any session in this process are applied
+    immediately; :meth:`sync` catches up on writes from other processes using
+    ``Opportunity.updated_at``. When ``path`` is set the index is loaded from
+    disk instead of being rebuilt from the table, and saved again every
+    ``SAVE_INTERVAL``.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._index: FlatIndex | None = None
+        self._synced_at: datetime | None = None
+        self._saved_at: datetime | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def reset(self) -> None:
+        """Forget the loaded and saved index, e.g. after the table was dropped."""
+        with self._lock:
+            self._index = None
+            self._synced_at = None
+            self._saved_at = None
+            if self.path:
+                Path(self.path, CURRENT).unlink(missing_ok=True)
+
+    def _apply(self, opp_id: UUID, status, embedding) -> None:
+        if status == OpportunityStatus.OPEN and embedding is not None:
+            self._index.add(opp_id, embedding)
+        else:
+            self._index.remove(opp_id)
+
+    def _rebuild(self, session: Session) -> None:
+        synced_at = datetime.utcnow()
+        rows = session.exec(
+            select(Opportunity.id, Opportunity.embedding).where(
+                Opportunity.status == OpportunityStatus.OPEN,
+                Opportunity.embedding.is_not(None),
+            )
+        ).all()
+        self._index = FlatIndex.from_vectors([oid for oid, _ in rows], [emb for _, emb in rows])
+        self._synced_at = synced_at
+        self._save()
+
+    def _save(self) -> None:
+        if self.path:
+            self._index.save(self.path, synced_at=self._synced_at.isoformat())
+            self._saved_at = self._synced_at
+
+    def _load(self) -> None:
+        try:
+            index, meta = FlatIndex.load(self.path, key=UUID)
+            synced_at = datetime.fromisoformat(meta["synced_at"])
+        except (OSError, ValueError, KeyError):
+            # missing, partial or mismatched snapshot: rebuild instead
+            return
+        self._index = index
+        self._synced_at = self._saved_at = synced_at
+
+    def sync(self, session: Session) -> "OpportunityIndex":
+        """Load the index if needed and apply rows changed since the last sync."""
+        with self._lock:
+            if self._index is None and self.path:
+                self._load()
+            if self._index is None:
+                self._rebuild(session)
+                return self
+            synced_at = datetime.utcnow()
+            changed = session.exec(
+                select(Opportunity.id, Opportunity.status, Opportunity.embedding).where(
+                    Opportunity.updated_at > self._synced_at - SYNC_LOOKBACK
+                )
+            ).all()
+            for opp_id, status, embedding in changed:
+                self._apply(opp_id, status, embedding)
+            self._synced_at = synced_at
+            if self._saved_at is not None and synced_at - self._saved_at >= SAVE_INTERVAL:
+                self._save()
+        return self
+
+    def apply(self, changes: Iterable[tuple[UUID, object, object]]) -> None:
+        """Apply ``(id, status, embedding)`` changes; ``status=None`` removes."""
+        with self._lock:
+            if self._index is None:
+                return
+            for opp_id, status, embedding in changes:
+                self._apply(opp_id, status, embedding)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index) if self._index is not None else 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._index is not None and key in self._index
+
+    # before the first sync the index is empty; writes are picked up by the
+    # rebuild that sync does instead
+
+    def add(self, key: Hashable, vector: Sequence[float]) -> None:
+        with self._lock:
+            if self._index is not None:
+                self._index.add(key, vector)
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            if self._index is not None:
+                self._index.remove(key)
+
+    def vectors(self, keys: Sequence[Hashable]) -> np.ndarray:
+        with self._lock:
+            if self._index is None:
+                if keys:
+                    raise KeyError(keys[0])
+                return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+            return self._index.vectors(keys)
+
+    def search_many(
+        self, queries: Sequence[Sequence[float]], k: int
+    ) -> list[list[tuple[Hashable, float]]]:
+        with self._lock:
+            if self._index is None:
+                return [[] for _ in queries]
+            return self._index.search_many(queries, k)
+
+
+opportunity_index = OpportunityIndex(get_settings().VECTOR_INDEX_PATH)
+
+_CHANGES = "opportunity_index_changes"
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _collect_opportunity_changes(session, flush_context) -> None:
+    if not opportunity_index.loaded:
+        return
+    changes = session.info.setdefault(_CHANGES, {})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Opportunity):
+            changes[obj.id] = (obj.status, obj.embedding)
+    for obj in session.deleted:
+        if isinstance(obj, Opportunity):
+            changes[obj.id] = (None, None)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_opportunity_changes(session) -> None:
+    changes = session.info.pop(_CHANGES, None)
+    if changes:
+        opportunity_index.apply((oid, status, emb) for oid, (status, emb) in changes.items())
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_opportunity_changes(session) -> None:
+    session.info.pop(_CHANGES, None)
+
+
+@event.listens_for(Opportunity.__table__, "after_drop")
+def _reset_opportunity_index(target, connection, **kw) -> None:
+    opportunity_index.reset()
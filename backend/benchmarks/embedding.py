@@ -0,0 +1,101 @@
+"""Latency and similarity drift of the int8 embedding backend against torch.
+
+Encodes the same texts with both backends and reports load time, per-call
+latency at each batch size, and how far the int8 vectors move: cosine
+similarity to the torch vectors and overlap of each text's nearest
+neighbours.
+
+    python -m benchmarks.embedding --texts 500 --threads 4
+    python -m benchmarks.embedding --seeded   # opportunity descriptions
+
+Requires sentence-transformers and torch.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+from faker import Faker
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import Opportunity
+from app.services.embedding import load_model
+
+
+def synthetic(count: int, seed: int) -> list[str]:
+    fake = Faker()
+    Faker.seed(seed)
+    return [fake.text() for _ in range(count)]
+
+
+def seeded(count: int) -> list[str]:
+    with Session(engine) as session:
+        texts = session.exec(select(Opportunity.description).limit(count)).all()
+    if not texts:
+        sys.exit("no opportunities found; seed the database first")
+    return list(texts)
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def neighbours(vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = vectors @ vectors.T
+    np.fill_diagonal(scores, -np.inf)
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    parser.add_argument("-k", type=int, default=10, help="neighbours compared for drift")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seeded", action="store_true", help="use the seeded database")
+    args = parser.parse_args()
+
+    texts = seeded(args.texts) if args.seeded else synthetic(args.texts, args.seed)
+    vectors = {}
+    print(f"{'backend':>8} {'batch':>6} {'p50 ms':>8} {'p95 ms':>8} {'texts/s':>9}")
+    for backend in ("torch", "int8"):
+        started = time.perf_counter()
+        model = load_model(backend, args.threads)
+        model.encode(["warmup"], show_progress_bar=False)
+        print(f"{backend:>8} loaded in {time.perf_counter() - started:.1f}s")
+        for batch_size in args.batch_sizes:
+            latencies = []
+            started = time.perf_counter()
+            for start in range(0, len(texts), batch_size):
+                batch = texts[start : start + batch_size]
+                call = time.perf_counter()
+                model.encode(batch, batch_size=batch_size, show_progress_bar=False)
+                latencies.append((time.perf_counter() - call) * 1000)
+            rate = len(texts) / (time.perf_counter() - started)
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{backend:>8} {batch_size:>6} {statistics.median(latencies):>8.2f} "
+                f"{p95:>8.2f} {rate:>9.1f}"
+            )
+        vectors[backend] = unit(
+            model.encode(texts, batch_size=max(args.batch_sizes), show_progress_bar=False)
+        )
+
+    cosine = (vectors["torch"] * vectors["int8"]).sum(axis=1)
+    k = min(args.k, len(texts) - 1)
+    expected, found = neighbours(vectors["torch"], k), neighbours(vectors["int8"], k)
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(expected, found)])
+    print(
+        f"int8 vs torch: cosine mean {cosine.mean():.5f} min {cosine.min():.5f}, "
+        f"neighbour overlap@{k} {overlap:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Recall@k vs latency of the pgvector ANN index.
+
+Loads embeddings into a temporary table, builds the index configured by the
+VECTOR_* settings and sweeps the query-time parameter (``hnsw.ef_search`` or
+``ivfflat.probes``). Recall is measured against exact NumPy search.
+
+    python -m benchmarks.vector_index --rows 20000 --queries 200 -k 20
+    python -m benchmarks.vector_index --seeded   # use the seeded database
+
+Requires DATABASE_URL to point at Postgres with the pgvector extension.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.config import get_settings
+from app.db import engine
+from app.models import Opportunity, VolunteerProfile, vector_index_options
+
+OPERATORS = {"vector_cosine_ops": "<=>", "vector_l2_ops": "<->", "vector_ip_ops": "<#>"}
+
+
+def synthetic(rows: int, queries: int, dim: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Clustered vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(rows // 200, 1), dim))
+    data = centers[rng.integers(len(centers), size=rows)] + 0.5 * rng.normal(size=(rows, dim))
+    probes = centers[rng.integers(len(centers), size=queries)] + 0.5 * rng.normal(size=(queries, dim))
+    return data.astype(np.float32), probes.astype(np.float32)
+
+
+def seeded(queries: int) -> tuple[np.ndarray, np.ndarray]:
+    """Opportunity embeddings as data, volunteer embeddings as queries."""
+    with Session(engine) as session:
+        data = session.exec(
+            select(Opportunity.embedding).where(Opportunity.embedding.is_not(None))
+        ).all()
+        probes = session.exec(
+            select(VolunteerProfile.embedding)
+            .where(VolunteerProfile.embedding.is_not(None))
+            .limit(queries)
+        ).all()
+    if not data or not probes:
+        sys.exit("no embeddings found; seed the database first")
+    return np.array(data, dtype=np.float32), np.array(probes, dtype=np.float32)
+
+
+def exact_top_k(data: np.ndarray, probes: np.ndarray, k: int, ops: str) -> np.ndarray:
+    if ops == "vector_cosine_ops":
+        unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+        scores = probes @ unit.T
+    elif ops == "vector_ip_ops":
+        scores = probes @ data.T
+    else:
+        # -|p - d|^2 up to a per-query constant
+        scores = 2 * probes @ data.T - (data**2).sum(axis=1)
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.7g}" for x in vector) + "]"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seeded", action="store_true", help="use the seeded database")
+    parser.add_argument(
+        "--values",
+        type=int,
+        nargs="+",
+        help="ef_search (hnsw) or probes (ivfflat) values to sweep",
+    )
+    args = parser.parse_args()
+
+    if engine.url.get_backend_name() != "postgresql":
+        sys.exit("vector index benchmark requires a Postgres DATABASE_URL")
+    settings = get_settings()
+    kind, ops = settings.VECTOR_INDEX_TYPE, settings.VECTOR_INDEX_OPS
+    parameter = "hnsw.ef_search" if kind == "hnsw" else "ivfflat.probes"
+    values = args.values or ([20, 40, 80, 160, 320] if kind == "hnsw" else [1, 5, 10, 20, 50])
+
+    if args.seeded:
+        data, probes = seeded(args.queries)
+    else:
+        data, probes = synthetic(args.rows, args.queries, args.dim, args.seed)
+    truth = exact_top_k(data, probes, args.k, ops)
+    options = vector_index_options("embedding")
+    with_clause = ", ".join(f"{key} = {value}" for key, value in options["postgresql_with"].items())
+
+    with engine.connect() as conn:
+        conn.execute(
+            text(f"CREATE TEMP TABLE bench_vectors (id int PRIMARY KEY, embedding vector({data.shape[1]}))")
+        )
+        conn.execute(
+            text("INSERT INTO bench_vectors VALUES (:id, CAST(:embedding AS vector))"),
+            [{"id": i, "embedding": literal(v)} for i, v in enumerate(data)],
+        )
+        started = time.perf_counter()
+        conn.execute(
+            text(f"CREATE INDEX ON bench_vectors USING {kind} (embedding {ops}) WITH ({with_clause})")
+        )
+        conn.execute(text("ANALYZE bench_vectors"))
+        print(f"{kind} ({ops}, {with_clause}) on {len(data)} rows built in {time.perf_counter() - started:.1f}s")
+
+        query = text(
+            f"SELECT id FROM bench_vectors ORDER BY embedding {OPERATORS[ops]} CAST(:q AS vector) LIMIT :k"
+        )
+        print(f"{parameter:>16} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for value in values:
+            conn.execute(text(f"SET {parameter} = {int(value)}"))
+            hits = 0
+            latencies = []
+            for probe, expected in zip(probes, truth):
+                vec = literal(probe)
+                started = time.perf_counter()
+                found = conn.execute(query, {"q": vec, "k": args.k}).scalars().all()
+                latencies.append((time.perf_counter() - started) * 1000)
+                hits += len(set(found) & set(expected.tolist()))
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            recall = hits / (len(probes) * args.k)
+            print(f"{value:>16} {recall:>10.3f} {statistics.median(latencies):>8.2f} {p95:>8.2f}")
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
+from functools import lru_cache
+
 from faker import Faker
 from sqlmodel import Session, select
 
-from app.routers.auth import get_password_hash
+from app.security import hash_password
 
 from app.db import engine, init_db
 from app.models import (
@@ -14,7 +16,8 @@ from app.models import (
     OpportunityStatus,
     ApplicationStatus,
 )
-from app.services.embedding import embed
+from app.matching import opportunity_text, profile_text
+from app.services.embedding import embed_many
 from random import sample, randint, choice
 
 fake = Faker()
@@ -22,6 +25,13 @@ fake = Faker()
 SKILLS = ["python", "javascript", "excel", "design", "marketing", "writing"]
 
 
+@lru_cache(maxsize=None)
+def get_password_hash(password: str) -> str:
+    # demo accounts share a few passwords, so hash each one once; the shared
+    # salt is acceptable for seed data only
+    return hash_password(password)
+
+
 def create_demo_accounts(session: Session) -> None:
     """Create predefined accounts for each user role."""
     demo_users = [
@@ -56,6 +66,7 @@ def create_users(session: Session, count: int = 500) -> list[User]:
 
 
 def create_profiles(session: Session, users: list[User]):
+    profiles = []
     for user in users:
         profile = VolunteerProfile(
             user_id=user.id,
@@ -71,8 +82,11 @@ def create_profiles(session: Session, users: list[User]):
             location_lng=float(fake.longitude()),
             availability_hours=randint(1, 10),
         )
-        profile.embedding = embed(" ".join(profile.skills or []))
         session.add(profile)
+        profiles.append(profile)
+    vectors = embed_many([profile_text(p) for p in profiles])
+    for profile, vector in zip(profiles, vectors):
+        profile.embedding = vector
     session.commit()
 
 
@@ -123,9 +137,10 @@ def create_opportunities(session: Session, orgs: list[Organization], count: int
             is_remote=True,
             status=OpportunityStatus.OPEN,
         )
-        opp.embedding = embed(opp.description)
         session.add(opp)
         opps.append(opp)
+    for opp, vector in zip(opps, embed_many([opportunity_text(o) for o in opps])):
+        opp.embedding = vector
     session.commit()
     for opp in opps:
         session.refresh(opp)
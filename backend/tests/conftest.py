@@ -18,6 +18,14 @@ def _docker_service_running(service: str = "db") -> bool:
 
 
 def pytest_configure(config):
-    """Fallback to SQLite when the db service is not available."""
+    """Fallback to SQLite and in-process Celery when services are not available."""
+    # keep the embedding cache in memory so runs don't share vectors
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+    os.environ.setdefault("EMBEDDING_WARMUP", "false")
+    # TestClient runs each request on a new event loop
+    os.environ.setdefault("DATABASE_ASYNC_POOL", "false")
+    # every TestClient request comes from the same address
+    os.environ.setdefault("AUTH_ADDRESS_RATE_PER_MINUTE", "0")
     if not _docker_service_running():
         os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+        os.environ.setdefault("CELERY_TASK_ALWAYS_EAGER", "true")
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def test_embedding_cache_tiers_and_eviction(tmp_path):
+    from app.services.embedding_cache import EmbeddingCache
+
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(t), 0.5] for t in texts], dtype=np.float32)
+
+    path = str(tmp_path / "cache.db")
+    cache = EmbeddingCache("m", path, memory_items=2, disk_items=3)
+    first = cache.embed_many(["a b", "a  b", "ccc", "a b"], encode)
+    # whitespace variants share a key and each distinct text is encoded once
+    assert calls == [["a b", "ccc"]]
+    assert first.dtype == np.float32 and first[:, 0].tolist() == [3, 3, 3, 3]
+    cache.close()
+
+    # a fresh process starts with an empty LRU but finds vectors on disk
+    cache = EmbeddingCache("m", path, memory_items=2, disk_items=3)
+    cache.embed_many(["a b", "ccc"], encode)
+    assert len(calls) == 1
+    assert cache.stats()["disk_hits"] == 2
+
+    cache.embed_many(["dd", "eeee"], encode)
+    stats = cache.stats()
+    assert stats["memory_items"] == 2 and stats["disk_items"] == 3
+    assert stats["misses"] == 2 and stats["evictions"] == 3
+
+    # another model never shares vectors
+    EmbeddingCache("other", path).embed_many(["dd"], encode)
+    assert calls[-1] == ["dd"]
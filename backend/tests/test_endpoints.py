@@ -1,6 +1,7 @@
 from fastapi.testclient import TestClient
 from app.main import app
 from app.db import init_db
+from sqlmodel import select
 
 client = TestClient(app)
 
@@ -29,6 +30,89 @@ def test_auth_register_login_and_me():
     assert me.json()["email"] == "a@example.com"
 
 
+def test_login_rate_limited(monkeypatch):
+    from app.security import address_limiter, login_limiter
+
+    for limiter, burst in ((login_limiter, 2), (address_limiter, 4)):
+        limiter.clear()
+        monkeypatch.setattr(limiter, "rate", 1 / 60)
+        monkeypatch.setattr(limiter, "burst", burst)
+    credentials = {"email": "a@example.com", "password": "wrong"}
+    assert client.post("/auth/login", json=credentials).status_code == 400
+    assert client.post("/auth/login", json=credentials).status_code == 400
+    limited = client.post("/auth/login", json=credentials)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+    # another account from the same address, until the address bucket is empty
+    other = {"email": "b@example.com", "password": "wrong"}
+    assert client.post("/auth/login", json=other).status_code == 400
+    assert client.post("/auth/login", json=other).status_code == 429
+    # registering hashes a password too
+    new = {"email": "c@example.com", "password": "pw", "role": "VOLUNTEER"}
+    assert client.post("/auth/register", json=new).status_code == 429
+    login_limiter.clear()
+    address_limiter.clear()
+
+
+def test_auth_skips_user_lookup_until_revoked(monkeypatch):
+    from uuid import uuid4
+    from sqlalchemy import delete
+    from sqlmodel import Session
+    from app.db import engine
+    from app.models import User
+    from app.routers import dependencies
+
+    token = client.post(
+        "/auth/register",
+        json={"email": "cached@example.com", "password": "pw", "role": "VOLUNTEER"},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/conversation", headers=headers).status_code == 200
+    with Session(engine) as session:
+        user_id = session.exec(select(User.id).where(User.email == "cached@example.com")).one()
+        # a bulk delete bypasses the ORM, so nothing is revoked
+        session.exec(delete(User).where(User.id == user_id))
+        session.commit()
+
+    # served from the user cache, then from the token's claims
+    assert client.get("/conversation", headers=headers).status_code == 200
+    dependencies.user_cache.clear()
+    monkeypatch.setattr(dependencies.settings, "AUTH_TRUST_CLAIMS", True)
+    assert client.get("/conversation", headers=headers).status_code == 200
+    workspace = f"/workspace/{uuid4()}"
+    assert client.get(workspace, headers=headers).status_code == 404
+
+    dependencies.revoke_user(user_id)
+    assert client.get("/conversation", headers=headers).status_code == 401
+    assert client.get(workspace, headers=headers).status_code == 401
+
+
+def test_user_changes_take_effect_immediately(monkeypatch):
+    from sqlmodel import Session
+    from app.db import engine
+    from app.models import User, UserRole
+    from app.routers import dependencies
+
+    monkeypatch.setattr(dependencies.settings, "AUTH_TRUST_CLAIMS", True)
+    token = client.post(
+        "/auth/register",
+        json={"email": "demoted@example.com", "password": "pw", "role": "SUPERADMIN"},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/settings/flags", headers=headers).status_code == 200
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == "demoted@example.com")).one()
+        user.role = UserRole.VOLUNTEER
+        session.add(user)
+        session.commit()
+        # the token still claims SUPERADMIN
+        assert client.get("/settings/flags", headers=headers).status_code == 403
+        session.delete(user)
+        session.commit()
+    assert client.get("/conversation", headers=headers).status_code == 401
+
+
 def test_full_flow():
     # register org admin
     resp = client.post(
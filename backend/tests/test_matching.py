@@ -1,6 +1,7 @@
 from app.db import init_db, engine
-from app.matching import compute_match_scores
+from app.matching import MATCH_SCORES_JOB, compute_match_scores
 from app.models import (
+    JobWatermark,
     VolunteerProfile,
     Opportunity,
     Application,
@@ -10,7 +11,7 @@ from app.models import (
     ApplicationStatus,
 )
 from sqlmodel import Session, select
-from datetime import date
+from datetime import date, datetime, timedelta
 
 
 def test_matching_empty_db():
@@ -68,8 +69,42 @@ def test_matching_with_data():
         )
         session.add(application)
         session.commit()
+        volunteer_id = user.id
+        application_id = application.id
 
     assert compute_match_scores() == 1
+    # rows stamped within SYNC_LOOKBACK of the last run are read again
+    assert compute_match_scores() == 1
+
+    def backdate(when):
+        with Session(engine) as session:
+            application = session.get(Application, application_id)
+            application.applied_at = when
+            for row in (
+                session.get(VolunteerProfile, volunteer_id),
+                session.get(Opportunity, application.opportunity_id),
+            ):
+                row.updated_at = when
+            session.commit()
+
+    backdate(datetime.utcnow() - timedelta(hours=1))
+    # nothing changed since the last run
+    assert compute_match_scores() == 0
+
+    # committed after that run started, but stamped just before it
+    with Session(engine) as session:
+        watermark = session.get(JobWatermark, MATCH_SCORES_JOB).value
+    backdate(watermark - timedelta(seconds=1))
+    assert compute_match_scores() == 1
+
+    with Session(engine) as session:
+        profile = session.get(VolunteerProfile, volunteer_id)
+        profile.skills = ["python", "sql"]
+        session.add(profile)
+        session.commit()
+
+    assert compute_match_scores() == 1
+    assert compute_match_scores(full=True) == 1
 
 
 def test_matching_embeddings(monkeypatch):
@@ -205,4 +240,408 @@ def test_tfidf_vectorizer_reuse(monkeypatch):
 
     assert compute_match_scores() == 2
     assert calls["fit"] == 1
-    assert calls["transform"] == 4
+    # one batched transform per side for the single chunk
+    assert calls["transform"] == 2
+
+
+def _unit(i: int) -> list[float]:
+    vec = [0.0] * 768
+    vec[i] = 1.0
+    return vec
+
+
+def test_refresh_recommendations_incremental():
+    """Only volunteers touched by an opportunity change are rewritten."""
+    from app.matching import refresh_recommendations
+    from app.models import Organization, Recommendation
+
+    init_db()
+    with Session(engine) as session:
+        owner = User(email="ro@example.com", hashed_password="x", role=UserRole.ORG_ADMIN)
+        session.add(owner)
+        session.commit()
+        org = Organization(owner_id=owner.id, name="O", description="d", website=None)
+        session.add(org)
+        vols = []
+        for i in range(2):
+            user = User(email=f"rv{i}@example.com", hashed_password="x", role=UserRole.VOLUNTEER)
+            session.add(user)
+            session.commit()
+            session.add(
+                VolunteerProfile(
+                    user_id=user.id,
+                    full_name="V",
+                    skills=[],
+                    interests=[],
+                    languages=[],
+                    location_country="US",
+                    location_city="A",
+                    availability_hours=5,
+                    embedding=_unit(i),
+                )
+            )
+            vols.append(user.id)
+        opps = []
+        for i in range(2):
+            opp = Opportunity(
+                org_id=org.id,
+                title=f"R{i}",
+                description="d",
+                skills_required=[],
+                min_hours=1,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 2),
+                status=OpportunityStatus.OPEN,
+                embedding=_unit(i),
+            )
+            session.add(opp)
+            opps.append(opp)
+        session.commit()
+        opp_ids = [o.id for o in opps]
+
+    assert refresh_recommendations() == 2
+    with Session(engine) as session:
+        top = session.exec(
+            select(Recommendation).where(Recommendation.rank == 1)
+        ).all()
+        assert {(r.volunteer_id, r.opportunity_id) for r in top} == set(zip(vols, opp_ids))
+
+        closed = session.get(Opportunity, opp_ids[0])
+        closed.status = OpportunityStatus.CLOSED
+        session.add(closed)
+        session.commit()
+
+    # both volunteers list the closed opportunity, so both are rebuilt
+    assert refresh_recommendations(None, [str(opp_ids[0])]) == 2
+    with Session(engine) as session:
+        rows = session.exec(select(Recommendation)).all()
+        assert {r.opportunity_id for r in rows} == {opp_ids[1]}
+
+
+def test_refresh_reranks_only_volunteers_an_opportunity_can_enter(monkeypatch):
+    """A new opportunity rebuilds only lists whose lowest score it reaches."""
+    import numpy as np
+    import pytest
+    from app import matching
+    from app.matching import refresh_recommendations
+    from app.models import Organization, Recommendation
+
+    monkeypatch.setattr(matching, "RECOMMENDATION_LIMIT", 1)
+    init_db()
+    with Session(engine) as session:
+        owner = User(email="bo@example.com", hashed_password="x", role=UserRole.ORG_ADMIN)
+        session.add(owner)
+        session.commit()
+        org = Organization(owner_id=owner.id, name="O", description="d", website=None)
+        session.add(org)
+        session.commit()
+
+        def opportunity(embedding):
+            opp = Opportunity(
+                org_id=org.id,
+                title="B",
+                description="d",
+                skills_required=[],
+                min_hours=1,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 2),
+                status=OpportunityStatus.OPEN,
+                embedding=embedding,
+            )
+            session.add(opp)
+            session.commit()
+            return str(opp.id)
+
+        # three volunteers whose best match scores 1.0, and one at 0.8
+        slanted = (0.8 * np.array(_unit(3)) + 0.6 * np.array(_unit(4))).tolist()
+        vols = []
+        for i, embedding in enumerate([_unit(0), _unit(1), _unit(2), slanted]):
+            user = User(email=f"bv{i}@example.com", hashed_password="x", role=UserRole.VOLUNTEER)
+            session.add(user)
+            session.commit()
+            session.add(
+                VolunteerProfile(
+                    user_id=user.id,
+                    full_name="V",
+                    skills=[],
+                    interests=[],
+                    languages=[],
+                    location_country="US",
+                    location_city="A",
+                    availability_hours=5,
+                    embedding=embedding,
+                )
+            )
+            vols.append(user.id)
+        for i in range(4):
+            opportunity(_unit(i))
+
+        def settle():
+            # outside the lookback window, so only the next opportunity counts
+            for opp in session.exec(select(Opportunity)).all():
+                opp.updated_at = datetime.utcnow() - timedelta(hours=1)
+            session.commit()
+
+        assert refresh_recommendations() == 4
+        settle()
+        # ties the top score of the first volunteer only
+        assert refresh_recommendations(None, [opportunity(_unit(0))]) == 1
+        settle()
+        # scores 0.6 for the last volunteer: below its 0.8, above nobody's
+        assert refresh_recommendations(None, [opportunity(_unit(4))]) == 0
+        settle()
+        # 0.9 beats the last volunteer's 0.8
+        closer = (0.9 * np.array(slanted) + np.sqrt(1 - 0.9**2) * np.array(_unit(5))).tolist()
+        assert refresh_recommendations(None, [opportunity(closer)]) == 1
+        top = session.exec(
+            select(Recommendation).where(Recommendation.volunteer_id == vols[3])
+        ).one()
+        assert top.score == pytest.approx(0.9)
+
+
+def test_tfidf_artifact_reused(monkeypatch):
+    """Later runs score against the stored vocabulary instead of refitting."""
+    from app import matching as m
+    from app.models import Organization
+
+    init_db()
+    fits = []
+
+    class CountingVectorizer(m.TfidfVectorizer):
+        def fit(self, raw_documents, y=None):  # type: ignore[override]
+            fits.append(1)
+            return super().fit(raw_documents, y)
+
+    monkeypatch.setattr(m, "TfidfVectorizer", CountingVectorizer)
+
+    with Session(engine) as session:
+        owner = User(email="oa@example.com", hashed_password="x", role=UserRole.ORG_ADMIN)
+        user = User(email="va@example.com", hashed_password="x", role=UserRole.VOLUNTEER)
+        session.add(owner)
+        session.add(user)
+        session.commit()
+        org = Organization(owner_id=owner.id, name="O", description="d", website=None)
+        session.add(org)
+        session.add(
+            VolunteerProfile(
+                user_id=user.id,
+                full_name="V",
+                skills=["python"],
+                interests=["data"],
+                languages=["en"],
+                location_country="US",
+                location_city="A",
+                availability_hours=5,
+            )
+        )
+        opps = [
+            Opportunity(
+                org_id=org.id,
+                title=f"A{i}",
+                description="d",
+                skills_required=["python"],
+                min_hours=1,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 2),
+                status=OpportunityStatus.OPEN,
+            )
+            for i in range(2)
+        ]
+        session.add_all(opps)
+        session.commit()
+        first = Application(
+            volunteer_id=user.id,
+            opportunity_id=opps[0].id,
+            status=ApplicationStatus.PENDING,
+        )
+        session.add(first)
+        session.commit()
+
+        assert compute_match_scores() == 1
+        assert len(fits) == 1
+
+        second = Application(
+            volunteer_id=user.id,
+            opportunity_id=opps[1].id,
+            status=ApplicationStatus.PENDING,
+        )
+        score = m.score_application(session, second)
+        session.add(second)
+        session.commit()
+
+        # the first application is still within SYNC_LOOKBACK
+        assert compute_match_scores() == 2
+        assert len(fits) == 1
+        session.refresh(second)
+        assert second.match_score == score
+
+
+def test_opportunity_index_follows_writes(tmp_path):
+    """The in-process index tracks committed opportunity writes and round-trips to disk."""
+    from app.matching import nearest_opportunities
+    from app.models import Organization
+    from app.services.vector_index import FlatIndex
+
+    init_db()
+    with Session(engine) as session:
+        owner = User(email="io@example.com", hashed_password="x", role=UserRole.ORG_ADMIN)
+        session.add(owner)
+        session.commit()
+        org = Organization(owner_id=owner.id, name="O", description="d", website=None)
+        session.add(org)
+        session.commit()
+
+        def opportunity(i):
+            opp = Opportunity(
+                org_id=org.id,
+                title=f"I{i}",
+                description="d",
+                skills_required=[],
+                min_hours=1,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 2),
+                status=OpportunityStatus.OPEN,
+                embedding=_unit(i),
+            )
+            session.add(opp)
+            session.commit()
+            return opp.id
+
+        first = opportunity(0)
+        assert nearest_opportunities(session, _unit(0), 1) == [(first, 1.0)]
+
+        # later commits, including a close, show up in the next search
+        second = opportunity(1)
+        assert nearest_opportunities(session, _unit(1), 1) == [(second, 1.0)]
+        closed = session.get(Opportunity, second)
+        closed.status = OpportunityStatus.CLOSED
+        session.add(closed)
+        session.commit()
+        assert [oid for oid, _ in nearest_opportunities(session, _unit(1), 5)] == [first]
+
+    index = FlatIndex.from_vectors(["a", "b", "c"], [_unit(0), _unit(1), _unit(2)])
+    index.remove("a")
+    index.add("d", _unit(3))
+    index.save(tmp_path)
+    loaded, _ = FlatIndex.load(tmp_path)
+    assert [key for key, _ in loaded.search(_unit(2), 2)][0] == "c"
+    assert loaded.search_many([_unit(3), _unit(1)], 1) == [[("d", 1.0)], [("b", 1.0)]]
+
+
+def test_index_snapshots(tmp_path, monkeypatch):
+    """Snapshots survive an empty save, reject mismatched files and are refreshed."""
+    import json
+    import numpy as np
+    import pytest
+    from app.services import vector_index
+    from app.services.vector_index import FlatIndex, OpportunityIndex
+
+    def current(path):
+        return path / (path / "CURRENT").read_text()
+
+    empty = tmp_path / "empty"
+    FlatIndex().save(empty)
+    loaded, _ = FlatIndex.load(empty)
+    loaded.add("a", _unit(0))
+    assert loaded.search(_unit(0), 1) == [("a", 1.0)]
+
+    # the replaced version stays readable; older ones are removed
+    first = current(empty)
+    FlatIndex.from_vectors(["a"], [_unit(0)]).save(empty)
+    FlatIndex.from_vectors(["a", "b"], [_unit(0), _unit(1)]).save(empty)
+    assert not first.exists()
+    assert len([p for p in empty.iterdir() if p.is_dir()]) == 2
+    assert [k for k, _ in FlatIndex.load(empty)[0].search(_unit(1), 2)] == ["b", "a"]
+
+    # keys from one save next to vectors from another are refused
+    np.save(current(empty) / "vectors.npy", np.zeros((1, 768), dtype=np.float32))
+    with pytest.raises(ValueError):
+        FlatIndex.load(empty)
+    with pytest.raises(FileNotFoundError):
+        FlatIndex.load(tmp_path / "missing")
+
+    init_db()
+    path = tmp_path / "opportunities"
+    monkeypatch.setattr(vector_index, "SAVE_INTERVAL", timedelta(0))
+    with Session(engine) as session:
+        OpportunityIndex(str(path)).sync(session)
+        saved = json.loads((current(path) / "keys.json").read_text())["synced_at"]
+        # a restarted process loads the snapshot, catches up and saves again
+        OpportunityIndex(str(path)).sync(session)
+    assert json.loads((current(path) / "keys.json").read_text())["synced_at"] > saved
+
+    # until the first sync the index is empty rather than broken
+    unsynced = OpportunityIndex()
+    unsynced.add("a", _unit(0))
+    unsynced.remove("a")
+    assert len(unsynced) == 0
+    assert unsynced.search(_unit(0), 3) == []
+    assert unsynced.vectors([]).shape == (0, 768)
+    with pytest.raises(KeyError):
+        unsynced.vectors(["a"])
+
+
+def test_embed_pending_dedupes_and_writes_back(monkeypatch):
+    """Queued entities are embedded once per batch and removed from the queue."""
+    from app import matching as m
+    from app.models import EmbeddingTarget, Organization, PendingEmbedding
+
+    init_db()
+    encoded = []
+
+    def fake_embed_many(texts):
+        encoded.append(list(texts))
+        return [_unit(len(text)) for text in texts]
+
+    monkeypatch.setattr(m, "embed_many", fake_embed_many)
+    with Session(engine) as session:
+        owner = User(email="eo@example.com", hashed_password="x", role=UserRole.ORG_ADMIN)
+        user = User(email="ev@example.com", hashed_password="x", role=UserRole.VOLUNTEER)
+        session.add(owner)
+        session.add(user)
+        session.commit()
+        org = Organization(owner_id=owner.id, name="O", description="d", website=None)
+        session.add(org)
+        profile = VolunteerProfile(
+            user_id=user.id,
+            full_name="V",
+            skills=["ab"],
+            interests=[],
+            languages=[],
+            location_country="US",
+            location_city="A",
+            availability_hours=5,
+        )
+        opp = Opportunity(
+            org_id=org.id,
+            title="E",
+            description="abc",
+            skills_required=[],
+            min_hours=1,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 2),
+            status=OpportunityStatus.OPEN,
+        )
+        session.add(profile)
+        session.add(opp)
+        session.commit()
+        volunteer_id, opp_id = user.id, opp.id
+        for _ in range(3):
+            m.queue_embedding(session, EmbeddingTarget.VOLUNTEER, volunteer_id)
+            session.commit()
+        m.queue_embedding(session, EmbeddingTarget.OPPORTUNITY, opp_id)
+        session.commit()
+
+    assert m.embed_pending() == 2
+    assert sorted(encoded) == [["ab"], ["abc"]]
+    with Session(engine) as session:
+        assert session.exec(select(PendingEmbedding)).all() == []
+        assert list(session.get(VolunteerProfile, volunteer_id).embedding) == _unit(2)
+        assert list(session.get(Opportunity, opp_id).embedding) == _unit(3)
+
+
+def test_beat_schedules_registered_tasks():
+    from app.matching import celery_app
+
+    for entry in celery_app.conf.beat_schedule.values():
+        assert entry["task"] in celery_app.tasks
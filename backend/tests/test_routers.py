@@ -226,3 +226,176 @@ def test_duplicate_application_rejected():
     assert dup.status_code == 400
     assert dup.json()["detail"] == "Already applied"
 
+
+
+def _sse_events(resp) -> list[tuple[str, str, str]]:
+    events = []
+    for block in resp.text.replace("\r\n", "\n").split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":")
+        )
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id", ""), fields.get("data", "")))
+    return events
+
+
+def _stream_matches(headers: dict) -> list[tuple[str, str, str]]:
+    from sse_starlette.sse import AppStatus
+
+    # the exit event is bound to the loop of the previous TestClient request
+    AppStatus.should_exit_event = None
+    resp = client.get("/match/me", headers=headers)
+    assert resp.status_code == 200
+    return _sse_events(resp)
+
+
+def test_match_stream_refines_stale_recommendations(monkeypatch):
+    """Stored results stream first, then a refined ranking when they are stale."""
+    import json
+    from datetime import date
+    from sqlmodel import Session
+    import asyncio
+    from app import matching
+    from app.db import engine
+    from app.matching import refresh_recommendations
+    from app.routers import match as match_router
+    from app.models import Opportunity, OpportunityStatus, VolunteerProfile
+
+    def unit(i):
+        vec = [0.0] * 768
+        vec[i] = 1.0
+        return vec
+
+    org_h, _ = _auth_header("org-sse@example.com", role="ORG_ADMIN")
+    org_id = client.post("/org", json={"name": "SSE", "description": "d"}, headers=org_h).json()["id"]
+
+    def add_opportunity(title, embedding):
+        with Session(engine) as session:
+            opp = Opportunity(
+                org_id=uuid.UUID(org_id),
+                title=title,
+                description="d",
+                skills_required=[],
+                min_hours=1,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 2),
+                status=OpportunityStatus.OPEN,
+                embedding=embedding,
+            )
+            session.add(opp)
+            session.commit()
+            return str(opp.id)
+
+    near = add_opportunity("near", [1.0, 1.0] + [0.0] * 766)
+    vol_h, vol_id = _auth_header("vol-sse@example.com")
+    with Session(engine) as session:
+        session.add(
+            VolunteerProfile(
+                user_id=uuid.UUID(vol_id),
+                full_name="S",
+                skills=[],
+                interests=[],
+                languages=[],
+                location_country="US",
+                location_city="A",
+                availability_hours=5,
+                embedding=unit(0),
+            )
+        )
+        session.commit()
+    refresh_recommendations([vol_id])
+    events = _stream_matches(vol_h)
+    assert [e[0] for e in events if e[0] != "match"] == ["done"]
+    assert json.loads(events[0][2])["id"] == near
+
+    exact = add_opportunity("exact", unit(0))
+    events = _stream_matches(vol_h)
+    first = [json.loads(d)["id"] for name, _, d in events if name == "match"]
+    refined = [json.loads(d)["id"] for name, _, d in events if name == "refined"]
+    assert first[0] == near
+    assert refined[:2] == [exact, near]
+    assert events[-1][0] == "done"
+
+    resumed = _stream_matches({**vol_h, "Last-Event-ID": "1:1"})
+    assert [(name, event_id) for name, event_id, _ in resumed][:1] == [("refined", "1:2")]
+
+    # a refresh that covers the change without touching this volunteer's
+    # list (e.g. it ranks elsewhere) means the stored list is current
+    def needs_refining():
+        with Session(engine) as session:
+            profile = session.get(VolunteerProfile, uuid.UUID(vol_id))
+        return asyncio.run(match_router._first_pass(profile, 1))[1]
+
+    refresh_recommendations([vol_id])
+    assert not needs_refining()
+    add_opportunity("elsewhere", unit(5))
+    assert needs_refining()
+    monkeypatch.setattr(matching, "_volunteers_affected_by", lambda *args: set())
+    refresh_recommendations(None, [])
+    assert not needs_refining()
+
+
+def test_close_opportunity_drops_it_from_recommendations():
+    """Only the owning org can close an opportunity; closing unlists it."""
+    from datetime import date
+    from sqlmodel import Session, select
+    from app.db import engine
+    from app.matching import refresh_recommendations
+    from app.models import Opportunity, OpportunityStatus, Recommendation, VolunteerProfile
+
+    embedding = [0.0] * 767 + [1.0]
+    org_h, _ = _auth_header("org-close@example.com", role="ORG_ADMIN")
+    org_id = client.post("/org", json={"name": "Close", "description": "d"}, headers=org_h).json()["id"]
+    with Session(engine) as session:
+        opp = Opportunity(
+            org_id=uuid.UUID(org_id),
+            title="closing",
+            description="d",
+            skills_required=[],
+            min_hours=1,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 2),
+            status=OpportunityStatus.OPEN,
+            embedding=embedding,
+        )
+        session.add(opp)
+        session.commit()
+        opp_id = str(opp.id)
+    vol_h, vol_id = _auth_header("vol-close@example.com")
+    with Session(engine) as session:
+        session.add(
+            VolunteerProfile(
+                user_id=uuid.UUID(vol_id),
+                full_name="C",
+                skills=[],
+                interests=[],
+                languages=[],
+                location_country="US",
+                location_city="A",
+                availability_hours=5,
+                embedding=embedding,
+            )
+        )
+        session.commit()
+    refresh_recommendations([vol_id])
+
+    def listing():
+        with Session(engine) as session:
+            return session.exec(
+                select(Recommendation.volunteer_id).where(
+                    Recommendation.opportunity_id == uuid.UUID(opp_id)
+                )
+            ).all()
+
+    assert uuid.UUID(vol_id) in listing()
+
+    other_h, _ = _auth_header("org-close-other@example.com", role="ORG_ADMIN")
+    assert client.post(f"/opportunity/{opp_id}/close", headers=other_h).status_code == 403
+    assert client.post(f"/opportunity/{opp_id}/close", headers=vol_h).status_code == 403
+    assert client.post(f"/opportunity/{uuid.uuid4()}/close", headers=org_h).status_code == 404
+    assert uuid.UUID(vol_id) in listing()
+
+    resp = client.post(f"/opportunity/{opp_id}/close", headers=org_h)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "CLOSED"
+    assert listing() == []
@@ -9,10 +9,10 @@ def setup_module():
     init_db()
 
 
-def _superadmin_header():
+def _superadmin_header(email="root@example.com"):
     resp = client.post(
         "/auth/register",
-        json={"email": "root@example.com", "password": "pw", "role": "SUPERADMIN"},
+        json={"email": email, "password": "pw", "role": "SUPERADMIN"},
     )
     token = resp.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
@@ -30,3 +30,36 @@ def test_toggle_flag_and_health():
     assert health.status_code == 200
     assert "db" in health.json()
 
+
+
+def test_db_pool_metrics():
+    headers = _superadmin_header("pool-root@example.com")
+    resp = client.get("/settings/db/pool", headers=headers)
+    assert resp.status_code == 200
+    primary = resp.json()["primary"]
+    assert primary["checkouts"] >= 1
+    assert primary["size"] == 5
+    assert 0 <= primary["saturation"] <= 1
+    volunteer = client.post(
+        "/auth/register",
+        json={"email": "pool-vol@example.com", "password": "pw", "role": "VOLUNTEER"},
+    ).json()["access_token"]
+    denied = client.get("/settings/db/pool", headers={"Authorization": f"Bearer {volunteer}"})
+    assert denied.status_code == 403
+
+
+def test_engines_for_other_urls():
+    import pytest
+    from app.db import InstrumentedQueuePool, _create_engine, async_database_url
+
+    assert async_database_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    with pytest.raises(ValueError, match="mysql"):
+        async_database_url("mysql://u@h/db")
+
+    # in-memory SQLite keeps its single shared connection
+    memory = _create_engine("sqlite://")
+    assert not isinstance(memory.pool, InstrumentedQueuePool)
+    with memory.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+    with memory.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
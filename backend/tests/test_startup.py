@@ -1,4 +1,5 @@
 import os
+import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
@@ -25,3 +26,14 @@ def test_startup_does_not_drop_tables(monkeypatch):
     # ensure row still exists
     with Session(engine) as session:
         assert session.get(User, uid) is not None
+
+
+def test_startup_does_not_load_embedding_model(monkeypatch):
+    from app.config import get_settings
+    from app.services import embedding
+
+    # only Celery workers embed, so the API never needs the model
+    monkeypatch.setattr(get_settings(), "EMBEDDING_WARMUP", True)
+    monkeypatch.setattr(embedding, "get_model", lambda: pytest.fail("model loaded"))
+    with TestClient(app):
+        pass
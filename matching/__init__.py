@@ -1,4 +1,5 @@
 """Matching utilities."""
+from .availability import SLOT_REGISTRY, SlotRegistry, compile_availability
 from .models import (
     Badge,
     LearningResource,
@@ -35,8 +36,17 @@ from .matching import (
     recommend_opportunities,
     recommend_volunteers,
     score_opportunity,
+    CompiledOpportunity,
+    CompiledVolunteer,
+    compile_opportunity,
+    compile_volunteer,
+    top_k,
     ANALYTICS_SERVICE,
 )
+from .bulk import CsvSink, bulk_match
+from .engine import OpportunityMatrix
+from .geo import GeoIndex, haversine_km, haversine_many
+from .index import SkillIndex
 
 __all__ = [
     "Location",
@@ -60,8 +70,23 @@ __all__ = [
     "VolunteerImpact",
     "PlatformInsights",
     "score_opportunity",
+    "CompiledOpportunity",
+    "CompiledVolunteer",
+    "compile_opportunity",
+    "compile_volunteer",
     "recommend_opportunities",
     "recommend_volunteers",
+    "top_k",
+    "OpportunityMatrix",
+    "bulk_match",
+    "CsvSink",
+    "SlotRegistry",
+    "SLOT_REGISTRY",
+    "compile_availability",
+    "GeoIndex",
+    "haversine_km",
+    "haversine_many",
+    "SkillIndex",
     "MatchFeedback",
     "FEEDBACK_STORE",
     "ENDORSEMENT_STORE",
@@ -0,0 +1,70 @@
+"""Compact integer bitmask encoding of weekly availability."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+DAYS: Tuple[str, ...] = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+BLOCKS: Tuple[str, ...] = ("am", "pm", "eve")
+
+
+class SlotRegistry:
+    """Intern ``(day, block)`` slots to bit positions.
+
+    The canonical days and blocks are registered up front in a fixed order so
+    their bits are the same in every process, which keeps compiled masks safe
+    to persist. Unknown slots are appended on first use.
+    """
+
+    def __init__(self, days: Iterable[str] = DAYS, blocks: Iterable[str] = BLOCKS) -> None:
+        self._bits: Dict[Tuple[str, str], int] = {}
+        self._slots: List[Tuple[str, str]] = []
+        blocks = tuple(blocks)
+        for day in days:
+            for block in blocks:
+                self.bit(day, block)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over registered slots in bit order."""
+        return iter(self._slots)
+
+    def bit(self, day: str, block: str) -> int:
+        """Return the bit position of a slot, registering it if new."""
+        key = (day, block)
+        pos = self._bits.get(key)
+        if pos is None:
+            pos = self._bits[key] = len(self._slots)
+            self._slots.append(key)
+        return pos
+
+    def compile(self, availability: Dict[str, List[str]]) -> int:
+        """Return the bitmask for a ``day -> blocks`` mapping."""
+        mask = 0
+        for day, blocks in availability.items():
+            for block in blocks:
+                mask |= 1 << self.bit(day, block)
+        return mask
+
+    def slots(self, mask: int) -> List[Tuple[str, str]]:
+        """Decode a bitmask back into its ``(day, block)`` slots."""
+        return [slot for pos, slot in enumerate(self._slots) if mask >> pos & 1]
+
+
+SLOT_REGISTRY = SlotRegistry()
+
+
+def compile_availability(
+    availability: Dict[str, List[str]], registry: SlotRegistry = SLOT_REGISTRY
+) -> int:
+    """Return the bitmask for ``availability`` using the shared registry."""
+    return registry.compile(availability)
+
+
+def availability_overlap(required: int, available: int) -> float:
+    """Return the fraction of required slots present in ``available``."""
+    required_count = required.bit_count()
+    if required_count == 0:
+        return 1.0
+    return (required & available).bit_count() / required_count
@@ -0,0 +1,176 @@
+"""Multi-process all-pairs matching of volunteers against a catalogue."""
+from __future__ import annotations
+
+import csv
+import multiprocessing
+from collections import deque
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from .availability import SLOT_REGISTRY
+from .engine import OpportunityMatrix, _top_indices
+from .matching import CompiledVolunteer, OpportunityLike, VolunteerLike
+from .models import VolunteerProfile
+
+Matches = List[Tuple[Hashable, float]]
+Sink = Callable[[Hashable, Matches], None]
+# shared memory block name, shape and dtype of each matrix array
+ArraySpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+_worker_matrix: Optional[OpportunityMatrix] = None
+_worker_segments: List[shared_memory.SharedMemory] = []
+
+
+class CsvSink:
+    """Write ``volunteer, opportunity, rank, score`` rows to a CSV file."""
+
+    def __init__(self, path: str) -> None:
+        self._fh = open(path, "w", newline="")
+        self._writer = csv.writer(self._fh)
+        self._writer.writerow(["volunteer", "opportunity", "rank", "score"])
+
+    def __call__(self, volunteer: Hashable, matches: Matches) -> None:
+        for rank, (opportunity, score) in enumerate(matches, start=1):
+            self._writer.writerow([volunteer, opportunity, rank, score])
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "CsvSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _share(matrix: OpportunityMatrix) -> Tuple[List[shared_memory.SharedMemory], ArraySpec]:
+    """Copy the matrix arrays into shared memory blocks."""
+    segments: List[shared_memory.SharedMemory] = []
+    specs: ArraySpec = {}
+    for name, array in matrix.arrays().items():
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        segments.append(segment)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        specs[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, specs
+
+
+def _init_worker(
+    specs: ArraySpec,
+    skill_names: List[str],
+    category_names: List[str],
+    slots: List[Tuple[str, str]],
+    radius_km: float,
+) -> None:
+    global _worker_matrix
+    # replay the parent's slot order so availability bits line up
+    for day, block in slots:
+        SLOT_REGISTRY.bit(day, block)
+    arrays = {}
+    for name, (segment_name, shape, dtype) in specs.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    _worker_matrix = OpportunityMatrix.from_arrays(arrays, skill_names, category_names, radius_km)
+
+
+def _rank_chunk(
+    matrix: OpportunityMatrix, chunk: Tuple[int, List[VolunteerProfile]], limit: int
+) -> Tuple[int, List[List[Tuple[int, float]]]]:
+    start, volunteers = chunk
+    return start, [
+        [(int(row), float(scores[row])) for row in _top_indices(scores, limit)]
+        for scores in matrix.score_many(volunteers)
+    ]
+
+
+def _rank_chunk_in_worker(
+    chunk: Tuple[int, List[VolunteerProfile]], limit: int
+) -> Tuple[int, List[List[Tuple[int, float]]]]:
+    assert _worker_matrix is not None
+    return _rank_chunk(_worker_matrix, chunk, limit)
+
+
+def _chunks(volunteers: Iterable[VolunteerLike], size: int) -> Iterator[Tuple[int, List[VolunteerProfile]]]:
+    # ship raw profiles: interned ids in compiled forms are process-local
+    raw = (v.source if isinstance(v, CompiledVolunteer) else v for v in volunteers)
+    start = 0
+    while True:
+        chunk = list(islice(raw, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def bulk_match(
+    volunteers: Iterable[VolunteerLike],
+    opportunities: Sequence[OpportunityLike],
+    sink: Sink,
+    limit: int = 10,
+    processes: Optional[int] = None,
+    chunk_size: int = 32,
+    radius_km: float = 50.0,
+    volunteer_keys: Optional[Sequence[Hashable]] = None,
+    opportunity_keys: Optional[Sequence[Hashable]] = None,
+) -> int:
+    """Score every volunteer against every opportunity and stream top-k to ``sink``.
+
+    The opportunity matrix is compiled once and placed in shared memory, and
+    volunteers are scored in chunks of ``chunk_size`` across a pool of
+    ``processes`` workers (all cores by default; ``1`` runs in process).
+    ``volunteers`` is consumed lazily with a bounded number of chunks in flight.
+    ``sink`` is called in the parent, in input order, with the volunteer key
+    and its ``(opportunity key, score)`` matches. Keys default to positions.
+    Returns the number of volunteers processed.
+    """
+    matrix = OpportunityMatrix(opportunities, radius_km=radius_km)
+    processes = processes or multiprocessing.cpu_count()
+    count = 0
+
+    def emit(result: Tuple[int, List[List[Tuple[int, float]]]]) -> None:
+        nonlocal count
+        start, ranked = result
+        for offset, matches in enumerate(ranked):
+            index = start + offset
+            key = volunteer_keys[index] if volunteer_keys is not None else index
+            if opportunity_keys is not None:
+                matches = [(opportunity_keys[row], score) for row, score in matches]
+            sink(key, matches)
+            count += 1
+
+    if processes == 1:
+        for chunk in _chunks(volunteers, chunk_size):
+            emit(_rank_chunk(matrix, chunk, limit))
+        return count
+
+    segments, specs = _share(matrix)
+    initargs = (specs, matrix.skill_names(), matrix.category_names(), list(SLOT_REGISTRY), radius_km)
+    try:
+        with multiprocessing.get_context().Pool(processes, _init_worker, initargs) as pool:
+            pending: Deque = deque()
+            for chunk in _chunks(volunteers, chunk_size):
+                pending.append(pool.apply_async(_rank_chunk_in_worker, (chunk, limit)))
+                if len(pending) >= 2 * processes:
+                    emit(pending.popleft().get())
+            while pending:
+                emit(pending.popleft().get())
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+    return count
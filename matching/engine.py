@@ -0,0 +1,234 @@
+"""Vectorized batch scoring of volunteers against a compiled opportunity set."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from .availability import SLOT_REGISTRY
+from .geo import GeoIndex
+from .matching import (
+    AVAILABILITY_WEIGHT,
+    CATEGORY_IDS,
+    CATEGORY_WEIGHT,
+    LOCATION_WEIGHT,
+    SKILL_IDS,
+    SKILL_WEIGHT,
+    OpportunityLike,
+    VolunteerLike,
+    compile_opportunity,
+    compile_volunteer,
+)
+
+_WORD_MASK = (1 << 64) - 1
+
+
+def _intern(vocab: Dict[int, int], key: int) -> int:
+    """Return the column index for ``key``, adding it to ``vocab`` if new."""
+    idx = vocab.get(key)
+    if idx is None:
+        idx = vocab[key] = len(vocab)
+    return idx
+
+
+def _mask_words(masks: Sequence[int], words: int) -> np.ndarray:
+    """Split availability bitmasks into an ``(len(masks), words)`` uint64 array."""
+    return np.array(
+        [[(mask >> (64 * w)) & _WORD_MASK for w in range(words)] for mask in masks],
+        dtype=np.uint64,
+    ).reshape(len(masks), words)
+
+
+def _top_indices(scores: np.ndarray, limit: int) -> np.ndarray:
+    """Return the indices of the ``limit`` best scores, ties in index order."""
+    limit = min(max(limit, 0), len(scores))
+    if limit == len(scores):
+        return np.argsort(-scores, kind="stable")
+    if limit == 0:
+        return np.empty(0, dtype=np.intp)
+    kth = -np.partition(-scores, limit - 1)[limit - 1]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: limit - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+class OpportunityMatrix:
+    """Opportunities compiled into NumPy arrays for batch scoring.
+
+    Scores produced here match :func:`matching.score_opportunity` to within
+    floating point tolerance, but a whole catalogue is scored in a handful of
+    matrix operations instead of one Python call per pair.
+    """
+
+    # arrays that fully describe the compiled catalogue, see from_arrays()
+    ARRAYS = (
+        "skill_weights",
+        "category_weights",
+        "required_bits",
+        "skill_max",
+        "category_max",
+        "required_total",
+        "has_location",
+        "latitudes",
+        "longitudes",
+    )
+
+    def __init__(self, opportunities: Iterable[OpportunityLike], radius_km: float = 50.0) -> None:
+        self.opportunities: List[OpportunityLike] = list(opportunities)
+        self.radius_km = radius_km
+        # interned skill/category id -> matrix column
+        self.skill_index: Dict[int, int] = {}
+        self.category_index: Dict[int, int] = {}
+
+        compiled = [compile_opportunity(o) for o in self.opportunities]
+        skills: List[Tuple[int, int, float]] = []
+        categories: List[Tuple[int, int, float]] = []
+        for row, opp in enumerate(compiled):
+            for ident, weight in zip(opp.skill_ids, opp.skill_weights):
+                skills.append((row, _intern(self.skill_index, ident), weight))
+            for ident, weight in zip(opp.category_ids, opp.category_weights):
+                categories.append((row, _intern(self.category_index, ident), weight))
+
+        n = len(compiled)
+        self.skill_weights = np.zeros((n, len(self.skill_index)))
+        for row, col, weight in skills:
+            self.skill_weights[row, col] = weight
+        self.category_weights = np.zeros((n, len(self.category_index)))
+        for row, col, weight in categories:
+            self.category_weights[row, col] = weight
+        # slots beyond the opportunities' highest bit can never be required
+        required_masks = [o.availability for o in compiled]
+        self.mask_words = max(1, -(-len(SLOT_REGISTRY) // 64))
+        self.required_bits = _mask_words(required_masks, self.mask_words)
+
+        self.skill_max = np.array([o.skill_max for o in compiled])
+        self.category_max = np.array([o.category_max for o in compiled])
+        self.required_total = np.array([m.bit_count() for m in required_masks], dtype=float)
+
+        self.has_location = np.array([o.location is not None for o in compiled], dtype=bool)
+        self.latitudes = np.array([o.location.latitude if o.location else np.nan for o in compiled])
+        self.longitudes = np.array([o.location.longitude if o.location else np.nan for o in compiled])
+        self.geo_index = self._build_geo_index()
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays: Dict[str, np.ndarray],
+        skill_names: Sequence[str],
+        category_names: Sequence[str],
+        radius_km: float = 50.0,
+    ) -> "OpportunityMatrix":
+        """Rebuild a matrix around existing arrays, e.g. views of shared memory.
+
+        ``skill_names``/``category_names`` give the skill and category of each
+        column, so the matrix works with this process's interned ids. The
+        opportunities themselves are not available; :meth:`rank` returns row
+        numbers instead.
+        """
+        matrix = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(matrix, name, arrays[name])
+        matrix.radius_km = radius_km
+        matrix.opportunities = list(range(len(matrix.skill_max)))
+        matrix.skill_index = {SKILL_IDS.id(name): col for col, name in enumerate(skill_names)}
+        matrix.category_index = {CATEGORY_IDS.id(name): col for col, name in enumerate(category_names)}
+        matrix.mask_words = matrix.required_bits.shape[1]
+        matrix.geo_index = matrix._build_geo_index()
+        return matrix
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Return the arrays accepted by :meth:`from_arrays`."""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    def skill_names(self) -> List[str]:
+        """Return the skill name of each column of ``skill_weights``."""
+        return [SKILL_IDS.name(ident) for ident in self.skill_index]
+
+    def category_names(self) -> List[str]:
+        """Return the category name of each column of ``category_weights``."""
+        return [CATEGORY_IDS.name(ident) for ident in self.category_index]
+
+    def _build_geo_index(self) -> GeoIndex:
+        index = GeoIndex(cell_km=self.radius_km)
+        for row in np.flatnonzero(self.has_location):
+            index.add(int(row), float(self.latitudes[row]), float(self.longitudes[row]))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.opportunities)
+
+    def _volunteer_arrays(self, volunteers: Sequence[VolunteerLike]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Project volunteers onto this matrix's skill and category columns."""
+        m = len(volunteers)
+        skill_points = np.zeros((m, len(self.skill_index)))
+        interest_points = np.zeros((m, len(self.category_index)))
+        for row, vol in enumerate(volunteers):
+            for ident, points in vol.skill_points.items():
+                col = self.skill_index.get(ident)
+                if col is not None:
+                    skill_points[row, col] = points
+            for ident, points in vol.interest_points.items():
+                col = self.category_index.get(ident)
+                if col is not None:
+                    interest_points[row, col] = points
+        available = _mask_words([v.availability for v in volunteers], self.mask_words)
+        return skill_points, interest_points, available
+
+    def _location_scores(self, volunteers: Sequence[VolunteerLike]) -> np.ndarray:
+        scores = np.ones((len(volunteers), len(self)))
+        for row, vol in enumerate(volunteers):
+            if vol.willing_to_remote:
+                continue
+            scores[row, self.has_location] = 0.0
+            if vol.preferred_location is not None:
+                nearby = self.geo_index.opportunities_within(vol.preferred_location, self.radius_km)
+                scores[row, nearby] = 1.0
+        return scores
+
+    def score_many(self, volunteers: Iterable[VolunteerLike]) -> np.ndarray:
+        """Return a ``(len(volunteers), len(self))`` array of match scores."""
+        volunteers = [compile_volunteer(v) for v in volunteers]
+        skill_points, interest_points, available = self._volunteer_arrays(volunteers)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skill_score = np.where(
+                self.skill_max != 0, (skill_points @ self.skill_weights.T) / self.skill_max, 0.0
+            )
+            category_score = np.where(
+                self.category_max != 0,
+                (interest_points @ self.category_weights.T) / self.category_max,
+                0.0,
+            )
+            satisfied = np.bitwise_count(
+                available[:, None, :] & self.required_bits[None, :, :]
+            ).sum(axis=2)
+            availability_score = np.where(
+                self.required_total != 0, satisfied / self.required_total, 1.0
+            )
+        location_score = self._location_scores(volunteers)
+
+        final = (
+            SKILL_WEIGHT * skill_score
+            + CATEGORY_WEIGHT * category_score
+            + AVAILABILITY_WEIGHT * availability_score
+            + LOCATION_WEIGHT * location_score
+        )
+        return np.clip(final, 0.0, 1.0)
+
+    def score(self, volunteer: VolunteerLike) -> np.ndarray:
+        """Return the score of ``volunteer`` against every opportunity."""
+        return self.score_many([volunteer])[0]
+
+    def rank(self, volunteer: VolunteerLike, limit: int = 5) -> List[Tuple[OpportunityLike, float]]:
+        """Return the top ``limit`` opportunities, ties kept in catalogue order."""
+        return self.rank_many([volunteer], limit)[0]
+
+    def rank_many(
+        self, volunteers: Iterable[VolunteerLike], limit: int = 5
+    ) -> List[List[Tuple[OpportunityLike, float]]]:
+        """Return the top ``limit`` opportunities for each volunteer."""
+        ranked = []
+        for scores in self.score_many(volunteers):
+            ranked.append([(self.opportunities[i], float(scores[i])) for i in _top_indices(scores, limit)])
+        return ranked
@@ -0,0 +1,121 @@
+"""Great-circle distances and a grid index for radius queries."""
+from __future__ import annotations
+
+from math import asin, atan2, cos, floor, pi, radians, sin, sqrt
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from .models import Location, Opportunity
+
+EARTH_RADIUS_KM = 6371.0
+# slack so floating point error never drops a point that is exactly on the radius
+_EPSILON_DEG = 1e-9
+# smaller cells, including the 0 km of a zero search radius, fall back to this
+MIN_CELL_KM = 1.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Return the distance in kilometers between two points given in degrees."""
+    lat1, lng1, lat2, lng2 = radians(lat1), radians(lng1), radians(lat2), radians(lng2)
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def haversine_many(lat, lng, lats, lngs) -> np.ndarray:
+    """Vectorized :func:`haversine_km`; arguments broadcast like NumPy arrays."""
+    lat, lng = np.radians(lat), np.radians(lng)
+    lats, lngs = np.radians(lats), np.radians(lngs)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class GeoIndex:
+    """Equal-angle lat/lng grid used to prune points outside a search radius.
+
+    Keys are arbitrary hashables such as opportunity ids or row numbers, and
+    coordinates are plain degrees. Cells are ``cell_km`` tall, but at least
+    :data:`MIN_CELL_KM`.
+    """
+
+    def __init__(self, cell_km: float = 50.0) -> None:
+        self.cell_deg = max(cell_km, MIN_CELL_KM) / (EARTH_RADIUS_KM * pi / 180)
+        self._columns = max(1, int(360 // self.cell_deg))
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float]]] = {}
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+
+    @classmethod
+    def from_opportunities(cls, opportunities: Iterable[Opportunity], cell_km: float = 50.0) -> "GeoIndex":
+        """Index in-person opportunities by their position in ``opportunities``."""
+        index = cls(cell_km)
+        for pos, opp in enumerate(opportunities):
+            if opp.location is not None:
+                index.add(pos, opp.location.latitude, opp.location.longitude)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def _row(self, lat: float) -> int:
+        return floor((lat + 90) / self.cell_deg)
+
+    def _column(self, lng: float) -> int:
+        return floor((lng + 180) / self.cell_deg) % self._columns
+
+    def add(self, key: Hashable, lat: float, lng: float) -> None:
+        """Insert or move ``key`` to the given coordinates."""
+        self.discard(key)
+        cell = (self._row(lat), self._column(lng))
+        self._cells.setdefault(cell, {})[key] = (lat, lng)
+        self._where[key] = cell
+
+    def discard(self, key: Hashable) -> None:
+        """Remove ``key`` if present."""
+        cell = self._where.pop(key, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
+
+    def _candidate_cells(self, lat: float, lng: float, radius_km: float) -> Set[Tuple[int, int]]:
+        angle = radius_km / EARTH_RADIUS_KM
+        dlat = angle * 180 / pi + _EPSILON_DEG
+        rows = range(self._row(max(lat - dlat, -90.0)), self._row(min(lat + dlat, 90.0)) + 1)
+        # longitude half-width of the bounding box; the whole circle near poles
+        columns: Set[int]
+        if abs(lat) + dlat >= 90 or angle >= pi / 2 or sin(angle) >= cos(radians(lat)):
+            columns = set(range(self._columns))
+        else:
+            dlng = asin(sin(angle) / cos(radians(lat))) * 180 / pi + _EPSILON_DEG
+            first = floor((lng - dlng + 180) / self.cell_deg)
+            last = floor((lng + dlng + 180) / self.cell_deg)
+            columns = {c % self._columns for c in range(first, last + 1)}
+        if len(rows) * len(columns) > len(self._cells):
+            # sparse grid: cheaper to filter the occupied cells
+            return {cell for cell in self._cells if cell[0] in rows and cell[1] in columns}
+        return {(r, c) for r in rows for c in columns if (r, c) in self._cells}
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """Return ``(key, distance_km)`` pairs within ``radius_km``, nearest first."""
+        keys: List[Hashable] = []
+        coords: List[Tuple[float, float]] = []
+        for cell in self._candidate_cells(lat, lng, radius_km):
+            for key, point in self._cells[cell].items():
+                keys.append(key)
+                coords.append(point)
+        if not keys:
+            return []
+        points = np.array(coords)
+        distances = haversine_many(lat, lng, points[:, 0], points[:, 1])
+        hits = np.flatnonzero(distances <= radius_km)
+        hits = hits[np.argsort(distances[hits], kind="stable")]
+        return [(keys[i], float(distances[i])) for i in hits]
+
+    def opportunities_within(self, location: Location, radius_km: float) -> List[Hashable]:
+        """Return the keys of indexed points within ``radius_km`` of ``location``."""
+        return [key for key, _ in self.within(location.latitude, location.longitude, radius_km)]
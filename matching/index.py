@@ -0,0 +1,151 @@
+"""Inverted skill/category index for candidate generation and pruning."""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from .matching import (
+    AVAILABILITY_WEIGHT,
+    CATEGORY_WEIGHT,
+    LOCATION_WEIGHT,
+    SKILL_WEIGHT,
+    CompiledOpportunity,
+    CompiledVolunteer,
+    OpportunityLike,
+    VolunteerLike,
+    _score_compiled,
+    compile_opportunity,
+    compile_volunteer,
+)
+
+# availability and location are not indexed, so assume they score perfectly
+_UNINDEXED_MAX = AVAILABILITY_WEIGHT + LOCATION_WEIGHT
+# guards the bound comparison against summation-order rounding
+_SLACK = 1e-9
+
+
+class SkillIndex:
+    """Postings from interned skill and category ids to opportunity keys.
+
+    :meth:`top_k` accumulates each volunteer's exact skill and category
+    contribution from the postings, adds the best possible availability and
+    location score to get an upper bound, and fully scores candidates in
+    descending bound order until no remaining bound can enter the top ``k``.
+    Opportunities sharing nothing with the volunteer are only scored when the
+    top ``k`` cannot be filled by better candidates.
+    """
+
+    def __init__(self) -> None:
+        self._opportunities: Dict[Hashable, OpportunityLike] = {}
+        self._compiled: Dict[Hashable, CompiledOpportunity] = {}
+        self._order: Dict[Hashable, int] = {}
+        self._skills: Dict[int, Dict[Hashable, float]] = {}
+        self._categories: Dict[int, Dict[Hashable, float]] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._opportunities)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._opportunities
+
+    def get(self, key: Hashable) -> Optional[OpportunityLike]:
+        return self._opportunities.get(key)
+
+    def add(self, key: Hashable, opportunity: OpportunityLike) -> None:
+        """Index ``opportunity`` under ``key``, replacing any previous version."""
+        if key in self._opportunities:
+            self._unlink(key)
+        else:
+            self._order[key] = self._seq
+            self._seq += 1
+        compiled = compile_opportunity(opportunity)
+        self._opportunities[key] = opportunity
+        self._compiled[key] = compiled
+        for ident, weight in zip(compiled.skill_ids, compiled.skill_weights):
+            self._skills.setdefault(ident, {})[key] = weight
+        for ident, weight in zip(compiled.category_ids, compiled.category_weights):
+            self._categories.setdefault(ident, {})[key] = weight
+
+    def remove(self, key: Hashable) -> None:
+        """Drop ``key`` from the index, e.g. when an opportunity closes."""
+        if key not in self._opportunities:
+            return
+        self._unlink(key)
+        del self._opportunities[key]
+        del self._compiled[key]
+        del self._order[key]
+
+    def _unlink(self, key: Hashable) -> None:
+        old = self._compiled[key]
+        for postings, idents in ((self._skills, old.skill_ids), (self._categories, old.category_ids)):
+            for ident in idents:
+                bucket = postings[ident]
+                del bucket[key]
+                if not bucket:
+                    del postings[ident]
+
+    def _partial_scores(self, volunteer: CompiledVolunteer) -> Dict[Hashable, float]:
+        """Return the exact skill + category contribution for every touched key."""
+        skill_totals: Dict[Hashable, float] = {}
+        for ident, points in volunteer.skill_points.items():
+            for key, weight in self._skills.get(ident, {}).items():
+                skill_totals[key] = skill_totals.get(key, 0.0) + weight * points
+        category_totals: Dict[Hashable, float] = {}
+        for ident, points in volunteer.interest_points.items():
+            for key, weight in self._categories.get(ident, {}).items():
+                category_totals[key] = category_totals.get(key, 0.0) + weight * points
+
+        partial: Dict[Hashable, float] = {}
+        for key, total in skill_totals.items():
+            skill_max = self._compiled[key].skill_max
+            partial[key] = SKILL_WEIGHT * total / skill_max if skill_max else 0.0
+        for key, total in category_totals.items():
+            category_max = self._compiled[key].category_max
+            partial[key] = partial.get(key, 0.0) + (
+                CATEGORY_WEIGHT * total / category_max if category_max else 0.0
+            )
+        return partial
+
+    def candidates(self, volunteer: VolunteerLike) -> Set[Hashable]:
+        """Return keys sharing at least one skill or category with ``volunteer``."""
+        volunteer = compile_volunteer(volunteer)
+        keys: Set[Hashable] = set()
+        for ident in volunteer.skill_points:
+            keys.update(self._skills.get(ident, ()))
+        for ident in volunteer.interest_points:
+            keys.update(self._categories.get(ident, ()))
+        return keys
+
+    def upper_bounds(self, volunteer: VolunteerLike) -> Dict[Hashable, float]:
+        """Return the best score each touched opportunity could reach."""
+        return {
+            key: max(0.0, part + _UNINDEXED_MAX)
+            for key, part in self._partial_scores(compile_volunteer(volunteer)).items()
+        }
+
+    def top_k(self, volunteer: VolunteerLike, limit: int = 5) -> List[Tuple[Hashable, float]]:
+        """Return the ``limit`` best ``(key, score)`` pairs, ties in insertion order.
+
+        The result is identical to scoring every indexed opportunity with
+        :func:`matching.score_opportunity`; only fewer of them are scored.
+        """
+        if limit <= 0:
+            return []
+        volunteer = compile_volunteer(volunteer)
+        bounds = self.upper_bounds(volunteer)
+        touched = sorted(bounds.items(), key=lambda kv: kv[1], reverse=True)
+        untouched: Iterator[Tuple[Hashable, float]] = (
+            (key, _UNINDEXED_MAX) for key in self._opportunities if key not in bounds
+        )
+        heap: List[Tuple[float, int, Hashable]] = []
+        for key, bound in heapq.merge(touched, untouched, key=lambda kv: kv[1], reverse=True):
+            if len(heap) == limit and bound + _SLACK < heap[0][0]:
+                break
+            entry = (_score_compiled(self._compiled[key], volunteer), -self._order[key], key)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        heap.sort(key=lambda e: e[:2], reverse=True)
+        return [(key, score) for score, _, key in heap]
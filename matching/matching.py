@@ -1,11 +1,15 @@
 """Simple matching algorithm using skill weights, availability, and location."""
 from __future__ import annotations
 
+import heapq
+from array import array
 from dataclasses import dataclass
 from datetime import datetime
 from uuid import uuid4
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
+from .availability import availability_overlap, compile_availability
+from .geo import haversine_km
 from .models import (
     Badge,
     LearningResource,
@@ -43,10 +47,127 @@ SKILL_WEIGHT = 0.6
 CATEGORY_WEIGHT = 0.1
 AVAILABILITY_WEIGHT = 0.2
 LOCATION_WEIGHT = 0.1
+# _combine clamps every score to at most this; the recommenders stop reading
+# candidates once they hold ``limit`` perfect matches
+MAX_SCORE = 1.0
+
+T = TypeVar("T")
+
+
+class NameRegistry:
+    """Intern skill or category names to dense integer ids."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def id(self, name: str) -> int:
+        """Return the id for ``name``, registering it if new."""
+        ident = self._ids.get(name)
+        if ident is None:
+            ident = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return ident
+
+    def name(self, ident: int) -> str:
+        return self._names[ident]
+
+
+SKILL_IDS = NameRegistry()
+CATEGORY_IDS = NameRegistry()
+
+
+class CompiledOpportunity:
+    """Opportunity with interned ids, array-backed weights and an availability mask."""
+
+    __slots__ = (
+        "source",
+        "skill_ids",
+        "skill_weights",
+        "skill_max",
+        "category_ids",
+        "category_weights",
+        "category_max",
+        "availability",
+        "location",
+    )
+
+    def __init__(self, opportunity: Opportunity) -> None:
+        self.source = opportunity
+        self.skill_ids = array("l", (SKILL_IDS.id(s) for s in opportunity.skills_weighted))
+        self.skill_weights = array("d", opportunity.skills_weighted.values())
+        self.skill_max = 0.0
+        for weight in self.skill_weights:
+            self.skill_max += weight * PROFICIENCY_POINTS["expert"]
+        self.category_ids = array("l", (CATEGORY_IDS.id(c) for c in opportunity.categories_weighted))
+        self.category_weights = array("d", opportunity.categories_weighted.values())
+        self.category_max = 0.0
+        for weight in self.category_weights:
+            self.category_max += weight * INTEREST_POINTS["high"]
+        self.availability = compile_availability(opportunity.availability_required)
+        self.location = opportunity.location
+
+
+class CompiledVolunteer:
+    """Volunteer with lowercased labels resolved to points keyed by interned id."""
+
+    __slots__ = (
+        "source",
+        "skill_points",
+        "interest_points",
+        "availability",
+        "preferred_location",
+        "willing_to_remote",
+        "desired_skill_ids",
+    )
+
+    def __init__(self, volunteer: VolunteerProfile) -> None:
+        self.source = volunteer
+        self.skill_points: Dict[int, int] = {
+            SKILL_IDS.id(skill): PROFICIENCY_POINTS.get(proficiency.lower(), 0)
+            for skill, proficiency in volunteer.skill_proficiency.items()
+            if proficiency
+        }
+        self.interest_points: Dict[int, int] = {
+            CATEGORY_IDS.id(category): INTEREST_POINTS.get(interest.lower(), 0)
+            for category, interest in volunteer.interest_level.items()
+            if interest
+        }
+        self.availability = compile_availability(volunteer.availability)
+        self.preferred_location = volunteer.preferred_location
+        self.willing_to_remote = volunteer.willing_to_remote
+        self.desired_skill_ids: FrozenSet[int] = frozenset(
+            SKILL_IDS.id(skill) for skill in volunteer.desired_skills
+        )
+
+
+OpportunityLike = Union[Opportunity, CompiledOpportunity]
+VolunteerLike = Union[VolunteerProfile, CompiledVolunteer]
+
+
+def compile_opportunity(opportunity: OpportunityLike) -> CompiledOpportunity:
+    """Return the compiled form of ``opportunity``; compiled input is returned as is."""
+    if isinstance(opportunity, CompiledOpportunity):
+        return opportunity
+    return CompiledOpportunity(opportunity)
+
+
+def compile_volunteer(volunteer: VolunteerLike) -> CompiledVolunteer:
+    """Return the compiled form of ``volunteer``; compiled input is returned as is."""
+    if isinstance(volunteer, CompiledVolunteer):
+        return volunteer
+    return CompiledVolunteer(volunteer)
 
 
 def _availability_score(required: Dict[str, List[str]], available: Dict[str, List[str]]) -> float:
-    """Return fraction of required time blocks the volunteer can satisfy."""
+    """Return fraction of required time blocks the volunteer can satisfy.
+
+    Raw dicts are compared with set lookups; building bitmasks for a single
+    comparison costs more than it saves. Compiled forms carry masks instead.
+    """
     required_blocks = sum(len(v) for v in required.values())
     if required_blocks == 0:
         return 1.0
@@ -59,19 +180,10 @@ def _availability_score(required: Dict[str, List[str]], available: Dict[str, Lis
 
 def _haversine_distance(loc1: Location, loc2: Location) -> float:
     """Compute the distance in kilometers between two points."""
-    from math import radians, sin, cos, sqrt, atan2
-
-    R = 6371.0
-    lat1, lon1 = radians(loc1.latitude), radians(loc1.longitude)
-    lat2, lon2 = radians(loc2.latitude), radians(loc2.longitude)
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+    return haversine_km(loc1.latitude, loc1.longitude, loc2.latitude, loc2.longitude)
 
 
-def _location_score(opportunity: Opportunity, volunteer: VolunteerProfile, radius_km: float = 50.0) -> float:
+def _location_score(opportunity: OpportunityLike, volunteer: VolunteerLike, radius_km: float = 50.0) -> float:
     """Return 1 if distance within radius or remote is allowed."""
     if opportunity.location is None or volunteer.willing_to_remote:
         return 1.0
@@ -81,8 +193,43 @@ def _location_score(opportunity: Opportunity, volunteer: VolunteerProfile, radiu
     return 1.0 if distance <= radius_km else 0.0
 
 
-def score_opportunity(opportunity: Opportunity, volunteer: VolunteerProfile) -> float:
-    """Return a normalized score between 0 and 1 including context."""
+def _combine(skill_score: float, category_score: float, availability_score: float, location_score: float) -> float:
+    # weighted combination
+    final_score = (
+        SKILL_WEIGHT * skill_score
+        + CATEGORY_WEIGHT * category_score
+        + AVAILABILITY_WEIGHT * availability_score
+        + LOCATION_WEIGHT * location_score
+    )
+    return max(0.0, min(MAX_SCORE, final_score))
+
+
+def _score_compiled(opportunity: CompiledOpportunity, volunteer: CompiledVolunteer) -> float:
+    skill_score = 0.0
+    if opportunity.skill_max:
+        skill_total = 0.0
+        points = volunteer.skill_points
+        for ident, weight in zip(opportunity.skill_ids, opportunity.skill_weights):
+            skill_total += weight * points.get(ident, 0)
+        skill_score = skill_total / opportunity.skill_max
+
+    category_score = 0.0
+    if opportunity.category_max:
+        category_total = 0.0
+        points = volunteer.interest_points
+        for ident, weight in zip(opportunity.category_ids, opportunity.category_weights):
+            category_total += weight * points.get(ident, 0)
+        category_score = category_total / opportunity.category_max
+
+    return _combine(
+        skill_score,
+        category_score,
+        availability_overlap(opportunity.availability, volunteer.availability),
+        _location_score(opportunity, volunteer),
+    )
+
+
+def _score_source(opportunity: Opportunity, volunteer: VolunteerProfile) -> float:
     skill_total = 0.0
     skill_max = 0.0
 
@@ -102,44 +249,112 @@ def score_opportunity(opportunity: Opportunity, volunteer: VolunteerProfile) ->
             points = INTEREST_POINTS.get(interest.lower(), 0)
             category_total += weight * points
 
-    skill_score = skill_total / skill_max if skill_max else 0.0
-    category_score = category_total / category_max if category_max else 0.0
-
-    availability_score = _availability_score(
-        opportunity.availability_required, volunteer.availability
+    return _combine(
+        skill_total / skill_max if skill_max else 0.0,
+        category_total / category_max if category_max else 0.0,
+        _availability_score(opportunity.availability_required, volunteer.availability),
+        _location_score(opportunity, volunteer),
     )
-    location_score = _location_score(opportunity, volunteer)
 
-    # weighted combination
-    final_score = (
-        SKILL_WEIGHT * skill_score
-        + CATEGORY_WEIGHT * category_score
-        + AVAILABILITY_WEIGHT * availability_score
-        + LOCATION_WEIGHT * location_score
-    )
-    return max(0.0, min(1.0, final_score))
+
+def score_opportunity(opportunity: OpportunityLike, volunteer: VolunteerLike) -> float:
+    """Return a normalized score between 0 and 1 including context.
+
+    Either argument may be a raw profile or its compiled form. Only a fully
+    compiled pair takes the fast path; a mixed pair is scored from the raw
+    sources because compiling one side for a single use costs more than it
+    saves.
+    """
+    if isinstance(opportunity, CompiledOpportunity):
+        if isinstance(volunteer, CompiledVolunteer):
+            return _score_compiled(opportunity, volunteer)
+        return _score_source(opportunity.source, volunteer)
+    if isinstance(volunteer, CompiledVolunteer):
+        return _score_source(opportunity, volunteer.source)
+    return _score_source(opportunity, volunteer)
+
+
+def top_k(
+    scored: Iterable[Tuple[T, float]], limit: int, threshold: Optional[float] = None
+) -> List[Tuple[T, float]]:
+    """Return the ``limit`` highest scoring pairs, best first.
+
+    ``scored`` is consumed lazily and only a heap of ``limit`` entries is kept,
+    so it may be a generator over arbitrarily many rows. Ties keep their input
+    order. Without a ``threshold`` every pair is read. With one, consumption
+    stops as soon as every kept score reaches it: the result is exact when no
+    score can exceed ``threshold`` (pass the scorer's maximum), and otherwise
+    settles for the first good-enough pairs.
+    """
+    if limit <= 0:
+        return []
+    heap: List[Tuple[float, int, T]] = []
+    for seq, (item, score) in enumerate(scored):
+        # negated sequence number makes later items lose ties
+        if len(heap) < limit:
+            heapq.heappush(heap, (score, -seq, item))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, -seq, item))
+        else:
+            continue
+        if threshold is not None and len(heap) == limit and heap[0][0] >= threshold:
+            break
+    heap.sort(reverse=True)
+    return [(item, score) for score, _, item in heap]
 
 
 def recommend_opportunities(
-    volunteer: VolunteerProfile, opportunities: Iterable[Opportunity], limit: int = 5
-) -> List[Tuple[Opportunity, float]]:
-    """Return top matching opportunities for a volunteer."""
-    scored = [
-        (opp, score_opportunity(opp, volunteer)) for opp in opportunities
-    ]
-    scored.sort(key=lambda pair: pair[1], reverse=True)
-    return scored[:limit]
+    volunteer: VolunteerLike,
+    opportunities: Iterable[OpportunityLike],
+    limit: int = 5,
+    threshold: Optional[float] = None,
+) -> List[Tuple[OpportunityLike, float]]:
+    """Return top matching opportunities for a volunteer.
+
+    Compiled opportunities are scored against the volunteer's compiled form,
+    built once on first use; raw ones are scored from the sources.
+    """
+    compiled = volunteer if isinstance(volunteer, CompiledVolunteer) else None
+    source = compiled.source if compiled is not None else volunteer
+
+    def scored() -> Iterator[Tuple[OpportunityLike, float]]:
+        nonlocal compiled
+        for opp in opportunities:
+            if isinstance(opp, CompiledOpportunity):
+                if compiled is None:
+                    compiled = CompiledVolunteer(source)
+                yield opp, _score_compiled(opp, compiled)
+            else:
+                yield opp, _score_source(opp, source)
+
+    return top_k(scored(), limit, MAX_SCORE if threshold is None else threshold)
 
 
 def recommend_volunteers(
-    opportunity: Opportunity, volunteers: Iterable[VolunteerProfile], limit: int = 5
-) -> List[Tuple[VolunteerProfile, float]]:
-    """Return top matching volunteers for an opportunity."""
-    scored = [
-        (vol, score_opportunity(opportunity, vol)) for vol in volunteers
-    ]
-    scored.sort(key=lambda pair: pair[1], reverse=True)
-    return scored[:limit]
+    opportunity: OpportunityLike,
+    volunteers: Iterable[VolunteerLike],
+    limit: int = 5,
+    threshold: Optional[float] = None,
+) -> List[Tuple[VolunteerLike, float]]:
+    """Return top matching volunteers for an opportunity.
+
+    Compiled volunteers are scored against the opportunity's compiled form,
+    built once on first use; raw ones are scored from the sources.
+    """
+    compiled = opportunity if isinstance(opportunity, CompiledOpportunity) else None
+    source = compiled.source if compiled is not None else opportunity
+
+    def scored() -> Iterator[Tuple[VolunteerLike, float]]:
+        nonlocal compiled
+        for vol in volunteers:
+            if isinstance(vol, CompiledVolunteer):
+                if compiled is None:
+                    compiled = CompiledOpportunity(source)
+                yield vol, _score_compiled(compiled, vol)
+            else:
+                yield vol, _score_source(source, vol)
+
+    return top_k(scored(), limit, MAX_SCORE if threshold is None else threshold)
 
 
 @dataclass
@@ -249,20 +464,27 @@ def leaderboard_by_hours(volunteer_hours: Dict[str, int]) -> List[Tuple[str, int
 
 
 def suggest_learning_path(
-    volunteer: VolunteerProfile,
-    opportunities: Iterable[Opportunity],
+    volunteer: VolunteerLike,
+    opportunities: Iterable[OpportunityLike],
     resources: Iterable[LearningResource],
     limit: int = 5,
-) -> Tuple[List[Opportunity], List[LearningResource]]:
+) -> Tuple[List[OpportunityLike], List[LearningResource]]:
     """Suggest opportunities and resources to develop desired skills."""
-    relevant_opps = [
-        (opp, score_opportunity(opp, volunteer))
-        for opp in opportunities
-        if any(skill in volunteer.desired_skills for skill in opp.skills_weighted)
-    ]
-    relevant_opps.sort(key=lambda p: p[1], reverse=True)
-    opps = [o for o, _ in relevant_opps[:limit]]
-    res = [r for r in resources if r.skill_name in volunteer.desired_skills]
+    compiled = compile_volunteer(volunteer)
+    desired_ids = compiled.desired_skill_ids
+    desired_names = set(compiled.source.desired_skills)
+
+    def relevant():
+        for opp in opportunities:
+            if isinstance(opp, CompiledOpportunity):
+                wanted = any(ident in desired_ids for ident in opp.skill_ids)
+            else:
+                wanted = any(skill in desired_names for skill in opp.skills_weighted)
+            if wanted:
+                yield opp, score_opportunity(opp, compiled)
+
+    opps = [o for o, _ in top_k(relevant(), limit, MAX_SCORE)]
+    res = [r for r in resources if r.skill_name in desired_names]
     return opps, res
 
 
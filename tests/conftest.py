@@ -0,0 +1,63 @@
+import copy
+import random
+
+import pytest
+
+from matching import Location, Opportunity, VolunteerProfile
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+BLOCKS = ["am", "pm", "eve"]
+# a small vocabulary so many pairs share skills and scores tie
+SKILLS = ["python", "excel", "design", "writing", "first aid", "driving"]
+CATEGORIES = ["education", "health", "environment", "arts"]
+PROFICIENCIES = ["beginner", "intermediate", "expert", "Expert", "guru", ""]
+INTERESTS = ["low", "medium", "high", "HIGH", ""]
+
+
+def _availability(rng: random.Random) -> dict:
+    return {day: rng.sample(BLOCKS, rng.randint(1, 3)) for day in rng.sample(DAYS, rng.randint(0, 4))}
+
+
+def _location(rng: random.Random):
+    if rng.random() < 0.3:
+        return None
+    # a few cities 0.3 degrees apart, so the 50 km radius both hits and misses
+    return Location(52.0 + 0.3 * rng.randint(0, 3), 13.0 + 0.3 * rng.randint(0, 3))
+
+
+def _opportunity(rng: random.Random) -> Opportunity:
+    return Opportunity(
+        skills_weighted={s: rng.randint(1, 5) for s in rng.sample(SKILLS, rng.randint(0, 3))},
+        categories_weighted={c: rng.randint(1, 5) for c in rng.sample(CATEGORIES, rng.randint(0, 2))},
+        availability_required=_availability(rng),
+        location=_location(rng),
+    )
+
+
+def _volunteer(rng: random.Random) -> VolunteerProfile:
+    return VolunteerProfile(
+        skill_proficiency={s: rng.choice(PROFICIENCIES) for s in rng.sample(SKILLS, rng.randint(0, 4))},
+        interest_level={c: rng.choice(INTERESTS) for c in rng.sample(CATEGORIES, rng.randint(0, 3))},
+        availability=_availability(rng),
+        preferred_location=_location(rng),
+        willing_to_remote=rng.random() < 0.4,
+    )
+
+
+@pytest.fixture
+def catalogue():
+    """Return ``make(seed, opportunities, volunteers)`` building random profiles.
+
+    Some opportunities are exact copies of others, so rankings contain ties.
+    Skills, categories, availability and locations are each sometimes empty.
+    """
+
+    def make(seed: int, opportunities: int = 60, volunteers: int = 25):
+        rng = random.Random(seed)
+        opps = [_opportunity(rng) for _ in range(opportunities)]
+        for _ in range(opportunities // 5):
+            opps.insert(rng.randrange(len(opps) + 1), copy.deepcopy(rng.choice(opps)))
+        vols = [_volunteer(rng) for _ in range(volunteers)]
+        return opps, vols
+
+    return make
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from matching import SLOT_REGISTRY, SlotRegistry, compile_availability
+from matching.availability import BLOCKS, DAYS, availability_overlap
+
+# unknown names are registered on first use
+ALL_DAYS = list(DAYS) + ["holiday"]
+ALL_BLOCKS = list(BLOCKS) + ["night"]
+
+
+def brute_force(required, available):
+    """Fraction of required (day, block) slots that are available."""
+    needed = {(day, block) for day, blocks in required.items() for block in blocks}
+    if not needed:
+        return 1.0
+    offered = {(day, block) for day, blocks in available.items() for block in blocks}
+    return len(needed & offered) / len(needed)
+
+
+def random_availability(rng):
+    # blocks are unique within a day: a mask counts a repeated block once
+    return {
+        day: rng.sample(ALL_BLOCKS, rng.randint(0, len(ALL_BLOCKS)))
+        for day in rng.sample(ALL_DAYS, rng.randint(0, len(ALL_DAYS)))
+    }
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_overlap_matches_set_intersection(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        required, available = random_availability(rng), random_availability(rng)
+        got = availability_overlap(compile_availability(required), compile_availability(available))
+        assert got == pytest.approx(brute_force(required, available), abs=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_masks_decode_to_their_slots(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        availability = random_availability(rng)
+        slots = SLOT_REGISTRY.slots(compile_availability(availability))
+        assert sorted(slots) == sorted((d, b) for d, blocks in availability.items() for b in blocks)
+
+
+def test_canonical_slots_have_fixed_bits():
+    first, second = SlotRegistry(), SlotRegistry()
+    second.bit("holiday", "night")
+    assert first.bit("mon", "am") == 0
+    assert first.bit("sun", "eve") == len(DAYS) * len(BLOCKS) - 1
+    # masks of canonical slots don't depend on what else was registered
+    week = {"mon": ["am"], "fri": ["pm", "eve"]}
+    assert first.compile(week) == second.compile(week)
+    assert first.bit("holiday", "night") == len(DAYS) * len(BLOCKS)
+
+
+def test_empty_requirements_are_always_met():
+    assert availability_overlap(compile_availability({}), 0) == 1.0
+    assert availability_overlap(compile_availability({"mon": []}), 0) == 1.0
+    assert availability_overlap(compile_availability({"mon": ["am"]}), 0) == 0.0
@@ -0,0 +1,57 @@
+import pytest
+
+from matching import CsvSink, bulk_match, compile_volunteer, score_opportunity
+
+
+def collect(volunteers, opportunities, **kwargs):
+    results = {}
+    count = bulk_match(
+        volunteers,
+        opportunities,
+        lambda key, matches: results.setdefault(key, matches),
+        opportunity_keys=list(range(len(opportunities))),
+        **kwargs,
+    )
+    assert count == len(results)
+    return results
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_workers_match_single_process_and_sorting(catalogue, seed):
+    opportunities, volunteers = catalogue(seed, volunteers=50)
+    single = collect(volunteers, opportunities, limit=8, processes=1, chunk_size=7)
+    shared = collect(iter(volunteers), opportunities, limit=8, processes=2, chunk_size=7)
+    assert shared == single
+    for key, volunteer in enumerate(volunteers):
+        scores = [score_opportunity(o, volunteer) for o in opportunities]
+        # the stable sort keeps ties in catalogue order
+        expected = sorted(range(len(opportunities)), key=lambda i: -scores[i])[:8]
+        assert [row for row, _ in single[key]] == expected
+        assert [s for _, s in single[key]] == pytest.approx([scores[i] for i in expected], abs=1e-12)
+
+
+def test_compiled_volunteers_and_keys(catalogue):
+    opportunities, volunteers = catalogue(3, volunteers=10)
+    keys = [f"v{i}" for i in range(len(volunteers))]
+    raw = collect(volunteers, opportunities, processes=2, volunteer_keys=keys)
+    compiled = collect(
+        [compile_volunteer(v) for v in volunteers], opportunities, processes=2, volunteer_keys=keys
+    )
+    assert list(raw) == keys
+    assert compiled == raw
+
+
+def test_empty_inputs(catalogue):
+    opportunities, volunteers = catalogue(4, volunteers=5)
+    assert collect([], opportunities, processes=2) == {}
+    assert collect(volunteers, [], processes=2) == {i: [] for i in range(len(volunteers))}
+
+
+def test_csv_sink(catalogue, tmp_path):
+    opportunities, volunteers = catalogue(5, volunteers=3)
+    path = tmp_path / "matches.csv"
+    with CsvSink(str(path)) as sink:
+        bulk_match(volunteers, opportunities, sink, limit=2, processes=1)
+    lines = path.read_text().splitlines()
+    assert lines[0] == "volunteer,opportunity,rank,score"
+    assert len(lines) == 1 + 2 * len(volunteers)
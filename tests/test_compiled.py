@@ -0,0 +1,67 @@
+import pytest
+
+from matching import (
+    CompiledOpportunity,
+    CompiledVolunteer,
+    Location,
+    Opportunity,
+    VolunteerProfile,
+    compile_opportunity,
+    compile_volunteer,
+    recommend_opportunities,
+    recommend_volunteers,
+    score_opportunity,
+)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compiled_pairs_score_like_raw_profiles(catalogue, seed):
+    opportunities, volunteers = catalogue(seed)
+    for volunteer in volunteers:
+        vol = compile_volunteer(volunteer)
+        for opportunity in opportunities:
+            opp = compile_opportunity(opportunity)
+            expected = score_opportunity(opportunity, volunteer)
+            for pair in ((opp, vol), (opp, volunteer), (opportunity, vol)):
+                assert score_opportunity(*pair) == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_recommenders_rank_compiled_like_sorting(catalogue, seed):
+    opportunities, volunteers = catalogue(seed)
+    compiled = [compile_opportunity(o) for o in opportunities]
+    for volunteer in volunteers:
+        scores = [score_opportunity(o, volunteer) for o in opportunities]
+        expected = sorted(range(len(opportunities)), key=lambda i: -scores[i])[:10]
+        got = recommend_opportunities(compile_volunteer(volunteer), compiled, limit=10)
+        assert [compiled.index(o) for o, _ in got] == expected
+    pool = [compile_volunteer(v) for v in volunteers]
+    for opportunity in opportunities[:10]:
+        scores = [score_opportunity(opportunity, v) for v in volunteers]
+        expected = sorted(range(len(volunteers)), key=lambda i: -scores[i])[:10]
+        got = recommend_volunteers(compile_opportunity(opportunity), pool, limit=10)
+        assert [pool.index(v) for v, _ in got] == expected
+
+
+def test_labels_are_case_insensitive():
+    opportunity = Opportunity(skills_weighted={"python": 3}, categories_weighted={"health": 2})
+    volunteer = VolunteerProfile(
+        skill_proficiency={"python": "EXPERT"}, interest_level={"health": "High"}
+    )
+    score = score_opportunity(compile_opportunity(opportunity), compile_volunteer(volunteer))
+    assert score == pytest.approx(1.0)
+
+
+def test_compiled_forms_keep_source_and_use_slots():
+    opportunity = Opportunity(location=Location(1.0, 2.0))
+    volunteer = VolunteerProfile(desired_skills=["python"])
+    opp, vol = compile_opportunity(opportunity), compile_volunteer(volunteer)
+    assert isinstance(opp, CompiledOpportunity) and isinstance(vol, CompiledVolunteer)
+    assert opp.source is opportunity and vol.source is volunteer
+    assert opp.location == opportunity.location
+    # compiling twice is a no-op
+    assert compile_opportunity(opp) is opp and compile_volunteer(vol) is vol
+    for compiled in (opp, vol):
+        assert not hasattr(compiled, "__dict__")
+        with pytest.raises(AttributeError):
+            compiled.extra = 1
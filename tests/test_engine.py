@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from matching import OpportunityMatrix, compile_opportunity, compile_volunteer, score_opportunity
+
+
+def brute_force(volunteer, opportunities, limit):
+    """Catalogue positions, best first; the stable sort keeps ties in order."""
+    scores = [score_opportunity(o, volunteer) for o in opportunities]
+    ranked = sorted(range(len(opportunities)), key=lambda i: -scores[i])[:limit]
+    return ranked, [scores[i] for i in ranked]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scores_match_score_opportunity(catalogue, seed):
+    opportunities, volunteers = catalogue(seed)
+    matrix = OpportunityMatrix(opportunities)
+    expected = np.array([[score_opportunity(o, v) for o in opportunities] for v in volunteers])
+    np.testing.assert_allclose(matrix.score_many(volunteers), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("limit", [1, 10, 100])
+def test_rank_matches_sorting(catalogue, seed, limit):
+    opportunities, volunteers = catalogue(seed)
+    compiled = [compile_opportunity(o) for o in opportunities]
+    # compiled and raw inputs must rank the same
+    for matrix in (OpportunityMatrix(opportunities), OpportunityMatrix(compiled)):
+        rows = {id(o): i for i, o in enumerate(matrix.opportunities)}
+        for volunteer in volunteers:
+            positions, scores = brute_force(volunteer, opportunities, limit)
+            for vol in (volunteer, compile_volunteer(volunteer)):
+                got = matrix.rank(vol, limit=limit)
+                # ties break by catalogue order
+                assert [rows[id(o)] for o, _ in got] == positions
+                np.testing.assert_allclose([s for _, s in got], scores, rtol=0, atol=1e-12)
+
+
+def test_empty_catalogue_and_profiles(catalogue):
+    _, volunteers = catalogue(0)
+    matrix = OpportunityMatrix([])
+    assert matrix.score_many(volunteers).shape == (len(volunteers), 0)
+    assert matrix.rank(volunteers[0]) == []
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from matching import GeoIndex, Location, Opportunity, OpportunityMatrix, VolunteerProfile, haversine_km
+
+
+def brute_force(points, lat, lng, radius_km):
+    hits = [(key, haversine_km(lat, lng, *point)) for key, point in points.items()]
+    return sorted(key for key, distance in hits if distance <= radius_km)
+
+
+def build(points, cell_km):
+    index = GeoIndex(cell_km)
+    for key, (lat, lng) in points.items():
+        index.add(key, lat, lng)
+    return index
+
+
+def scatter(rng, lat_range, lng_range, n=300):
+    return {i: (rng.uniform(*lat_range), rng.uniform(*lng_range)) for i in range(n)}
+
+
+# (latitudes, longitudes) of the points and queries in each region
+REGIONS = {
+    "anywhere": ((-90, 90), (-180, 180)),
+    "antimeridian": ((-60, 60), (175, 185)),
+    "north pole": ((85, 90), (-180, 180)),
+    "south pole": ((-90, -85), (-180, 180)),
+}
+
+
+@pytest.mark.parametrize("region", REGIONS)
+@pytest.mark.parametrize("cell_km", [0, 10, 50, 500])
+@pytest.mark.parametrize("radius_km", [0, 25, 300, 3000])
+def test_within_matches_brute_force(region, cell_km, radius_km):
+    rng = random.Random(f"{region}-{cell_km}-{radius_km}")
+    lats, lngs = REGIONS[region]
+    # wrap longitudes past 180 back into range
+    points = {k: (lat, (lng + 180) % 360 - 180) for k, (lat, lng) in scatter(rng, lats, lngs).items()}
+    index = build(points, cell_km)
+    for _ in range(20):
+        lat, lng = rng.uniform(*lats), (rng.uniform(*lngs) + 180) % 360 - 180
+        found = index.within(lat, lng, radius_km)
+        assert sorted(key for key, _ in found) == brute_force(points, lat, lng, radius_km)
+        distances = [d for _, d in found]
+        assert distances == sorted(distances)
+
+
+def test_points_on_the_radius_are_included():
+    rng = random.Random(0)
+    points = scatter(rng, (-89, 89), (-180, 180), n=100)
+    index = build(points, 50)
+    for key, (lat, lng) in points.items():
+        qlat, qlng = lat + rng.uniform(-0.5, 0.5), lng + rng.uniform(-0.5, 0.5)
+        radius = haversine_km(qlat, qlng, lat, lng)
+        assert key in [k for k, _ in index.within(qlat, qlng, radius)]
+
+
+def test_zero_radius_and_moves():
+    index = GeoIndex(cell_km=0)
+    index.add("a", 10.0, 179.9)
+    index.add("b", 10.0, -179.9)
+    assert [k for k, _ in index.within(10.0, 179.9, 0)] == ["a"]
+    # either side of the antimeridian
+    assert sorted(k for k, _ in index.within(10.0, 180.0, 25)) == ["a", "b"]
+    index.add("a", -45.0, 0.0)
+    index.discard("b")
+    assert index.within(10.0, 180.0, 25) == []
+    assert len(index) == 1 and "a" in index
+
+
+def test_matrix_with_zero_radius():
+    here = Location(52.0, 13.0)
+    opportunities = [Opportunity({}, {}, {}, here), Opportunity({}, {}, {}, Location(52.1, 13.0))]
+    volunteer = VolunteerProfile({}, {}, {}, preferred_location=here, willing_to_remote=False)
+    scores = OpportunityMatrix(opportunities, radius_km=0).score_many([volunteer])
+    assert scores[0, 0] > scores[0, 1]
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from matching import SkillIndex, compile_volunteer, score_opportunity
+
+
+def exhaustive(index_items, volunteer, limit):
+    """Score and sort every indexed opportunity; ties stay in insertion order."""
+    scored = [(key, score_opportunity(o, volunteer)) for key, o in index_items]
+    return sorted(scored, key=lambda pair: -pair[1])[:limit]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("limit", [1, 5, 20, 200])
+def test_top_k_matches_exhaustive_scoring(catalogue, seed, limit):
+    opportunities, volunteers = catalogue(seed)
+    index = SkillIndex()
+    for key, opportunity in enumerate(opportunities):
+        index.add(key, opportunity)
+    items = list(enumerate(opportunities))
+    for volunteer in volunteers:
+        for vol in (volunteer, compile_volunteer(volunteer)):
+            assert index.top_k(vol, limit) == exhaustive(items, volunteer, limit)
+
+
+def test_top_k_after_updates(catalogue):
+    opportunities, volunteers = catalogue(7)
+    rng = random.Random(7)
+    index = SkillIndex()
+    items = {}
+    for key, opportunity in enumerate(opportunities):
+        index.add(key, opportunity)
+        items[key] = opportunity
+    for key in rng.sample(sorted(items), 15):
+        index.remove(key)
+        del items[key]
+    # replacing a key keeps its original position for tie-breaking
+    for key in rng.sample(sorted(items), 10):
+        items[key] = rng.choice(opportunities)
+        index.add(key, items[key])
+    for volunteer in volunteers:
+        assert index.top_k(volunteer, 10) == exhaustive(items.items(), volunteer, 10)
+    assert len(index) == len(items)
+
+
+def test_empty_index(catalogue):
+    _, volunteers = catalogue(0)
+    assert SkillIndex().top_k(volunteers[0], 5) == []
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from matching import top_k
+
+
+def brute_force(pairs, limit):
+    """Best first; the stable sort keeps ties in input order."""
+    return sorted(pairs, key=lambda pair: -pair[1])[:max(limit, 0)]
+
+
+def counting(pairs, seen):
+    for pair in pairs:
+        seen.append(pair)
+        yield pair
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("limit", [0, 1, 3, 10, 100])
+def test_matches_sorting(seed, limit):
+    rng = random.Random(seed)
+    # few distinct values, so ties straddle the cutoff; scores are not bounded by 1
+    pairs = [(i, rng.choice([0.0, 0.5, 1.0, 2.5, 7.0])) for i in range(50)]
+    assert top_k(iter(pairs), limit) == brute_force(pairs, limit)
+
+
+def test_scores_above_one_are_not_cut_short():
+    pairs = [("a", 1.0), ("b", 1.0), ("c", 3.0), ("d", 2.0)]
+    assert top_k(pairs, 2) == [("c", 3.0), ("d", 2.0)]
+
+
+def test_ties_at_cutoff_keep_input_order():
+    pairs = [("a", 0.2), ("b", 0.5), ("c", 0.5), ("d", 0.5), ("e", 0.9)]
+    assert top_k(pairs, 3) == [("e", 0.9), ("b", 0.5), ("c", 0.5)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_threshold_at_maximum_is_exact(seed):
+    rng = random.Random(seed)
+    pairs = [(i, rng.choice([0.0, 0.25, 0.5, 1.0])) for i in range(200)]
+    seen = []
+    assert top_k(counting(pairs, seen), 5, threshold=1.0) == brute_force(pairs, 5)
+    # stops after the fifth perfect score
+    perfect = [i for i, (_, score) in enumerate(pairs) if score == 1.0]
+    assert len(seen) == perfect[4] + 1
+
+
+def test_threshold_stops_at_good_enough():
+    pairs = [("a", 0.9), ("b", 0.1), ("c", 0.8), ("d", 1.0), ("e", 0.95)]
+    seen = []
+    assert top_k(counting(pairs, seen), 2, threshold=0.8) == [("a", 0.9), ("c", 0.8)]
+    assert len(seen) == 3
+    # never reached: every pair is read and the result is exact
+    assert top_k(pairs, 2, threshold=2.0) == brute_force(pairs, 2)